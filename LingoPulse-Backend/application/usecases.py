@@ -6,10 +6,45 @@ from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import replace
 
-from domain.entities import Conversation, Turn, SpeakerRole, ConversationType
+from domain.entities import Conversation, Turn, TurnFeatures, SpeakerRole, ConversationType
 from domain.features import FeatureExtractor
-from domain.pulse_model import PulseAnalyzer, PulseAnalysis
+from domain.pulse_model import PulseAnalyzer, PulseAnalysis, AnalysisInput
+
+
+logger = logging.getLogger(__name__)
+
+
+# 模拟分析历史中所有行共享的模式列表（不可变元组，跨行复用安全）
+_HISTORY_PULSE_PATTERNS = ("上升趋势", "稳定模式")
+
+# 枚举值查找表（CPython枚举的.value是描述符调用，逐点访问并不便宜）
+_SPEAKER_VALUE = {member: member.value for member in SpeakerRole}
+_CTYPE_VALUE = {member: member.value for member in ConversationType}
+
+
+# CPU密集型分析专用进程池（懒加载，避免导入时创建进程）
+_analysis_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def _run_analysis(pulse_analyzer: PulseAnalyzer, conversation: Conversation) -> PulseAnalysis:
+    """在工作进程中执行分析（顶层函数以便pickle）"""
+    return pulse_analyzer.analyze_conversation(conversation)
+
+
+def _get_analysis_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """获取分析进程池（单例）"""
+    global _analysis_pool
+    if _analysis_pool is None:
+        _analysis_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _analysis_pool
 
 
 class ConversationRepository(ABC):
@@ -35,6 +70,31 @@ class ConversationRepository(ABC):
         """获取对话的所有轮次"""
         pass
 
+    @abstractmethod
+    async def list_conversations(self, limit: int = 50, offset: int = 0) -> List[Conversation]:
+        """分页获取对话列表（LIMIT/OFFSET 下推到数据库）"""
+        pass
+
+    @abstractmethod
+    async def get_conversation_with_turns(self, conversation_id: str) -> Optional[Conversation]:
+        """一次查询获取对话及其全部轮次（JOIN）"""
+        pass
+
+    @abstractmethod
+    async def get_analysis_input(self, conversation_id: str) -> Optional[AnalysisInput]:
+        """只取分析所需字段（类型、参与者、轮次），跳过其余对话元数据"""
+        pass
+
+    @abstractmethod
+    async def get_conversations_bulk(self, conversation_ids: List[str]) -> Dict[str, Conversation]:
+        """批量获取对话（一次往返）"""
+        pass
+
+    @abstractmethod
+    async def get_turns_bulk(self, conversation_ids: List[str]) -> Dict[str, List[Turn]]:
+        """批量获取多个对话的轮次（一次往返）"""
+        pass
+
 
 class AnalysisCache(ABC):
     """分析缓存接口"""
@@ -49,6 +109,16 @@ class AnalysisCache(ABC):
         """获取缓存的分析结果"""
         pass
 
+    @abstractmethod
+    async def cache_analyses(self, analyses: Dict[str, PulseAnalysis], expire_seconds: int = 1800):
+        """批量缓存分析结果（实现应使用pipeline，一次往返写入全部条目）"""
+        pass
+
+    @abstractmethod
+    async def get_cached_analyses(self, conversation_ids: List[str]) -> Dict[str, PulseAnalysis]:
+        """批量获取缓存的分析结果（Redis MGET）"""
+        pass
+
 
 class CreateConversationUseCase:
     """创建对话用例"""
@@ -73,30 +143,60 @@ class CreateConversationUseCase:
         return conversation
 
 
+def _features_cache_key(content: str, previous_turns: List[Turn]) -> str:
+    """特征缓存键：内容哈希 + 最近几轮内容的签名"""
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16)
+    for prev_turn in previous_turns[-3:]:
+        encoded = prev_turn.content.encode("utf-8")
+        # 长度前缀消除相邻内容直接拼接的歧义（["ab","c"]与["a","bc"]）
+        digest.update(len(encoded).to_bytes(4, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
 class AddTurnUseCase:
     """添加对话轮次用例"""
-    
+
+    _FEATURES_CACHE_SIZE = 4096
+
     def __init__(self, conversation_repo: ConversationRepository, feature_extractor: FeatureExtractor):
         self.conversation_repo = conversation_repo
         self.feature_extractor = feature_extractor
-    
+        # 特征提取结果缓存（重发/重试的相同内容无需重新计算）
+        self._features_cache: Dict[str, TurnFeatures] = {}
+
     async def execute(self, conversation_id: str, content: str, speaker_role: SpeakerRole) -> Turn:
         """执行添加对话轮次用例"""
-        # 获取对话
-        conversation = await self.conversation_repo.get_conversation(conversation_id)
+        # 一次查询获取对话及其轮次
+        conversation = await self.conversation_repo.get_conversation_with_turns(conversation_id)
         if not conversation:
             raise Exception("Conversation not found")
-        
+
         # 创建新轮次
         turn = Turn(
             conversation_id=conversation_id,
             content=content,
             speaker_role=speaker_role
         )
-        
-        # 提取特征
-        previous_turns = await self.conversation_repo.get_conversation_turns(conversation_id)
-        turn.features = self.feature_extractor.extract_turn_features(turn, previous_turns)
+
+        # 提取特征（相同内容与上下文直接复用缓存结果）
+        cache_key = _features_cache_key(content, conversation.turns)
+        cached_features = self._features_cache.get(cache_key)
+        if cached_features is not None:
+            # 缓存键只含内容，response_delay却是时间量：命中时必须按
+            # 本次时间戳重算，照搬首次命中的延迟会喂给脉搏分析错误数据
+            response_delay = 0.0
+            if conversation.turns:
+                response_delay = max(
+                    0.0,
+                    (turn.timestamp - conversation.turns[-1].timestamp).total_seconds()
+                )
+            turn.features = replace(cached_features, response_delay=response_delay)
+        else:
+            turn.features = self.feature_extractor.extract_turn_features(turn, conversation.turns)
+            if len(self._features_cache) >= self._FEATURES_CACHE_SIZE:
+                self._features_cache.pop(next(iter(self._features_cache)))
+            self._features_cache[cache_key] = turn.features
         
         # 保存轮次
         success = await self.conversation_repo.save_turn(turn)
@@ -108,9 +208,13 @@ class AddTurnUseCase:
 
 class AnalyzeConversationUseCase:
     """分析对话用例"""
-    
+
+    # 进程内缓存参数：前端轮询的热对话免去Redis往返
+    _INPROC_TTL = 60.0
+    _INPROC_MAX = 1024
+
     def __init__(
-        self, 
+        self,
         conversation_repo: ConversationRepository,
         analysis_cache: AnalysisCache,
         pulse_analyzer: PulseAnalyzer
@@ -118,28 +222,55 @@ class AnalyzeConversationUseCase:
         self.conversation_repo = conversation_repo
         self.analysis_cache = analysis_cache
         self.pulse_analyzer = pulse_analyzer
-    
+        # 两级缓存的第一级：进程内LRU（第二级是Redis）
+        self._inproc: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _inproc_get(self, conversation_id: str) -> Optional[PulseAnalysis]:
+        """读进程内缓存（过期即删除）"""
+        hit = self._inproc.get(conversation_id)
+        if hit is None:
+            return None
+        cached_at, analysis = hit
+        if time.monotonic() - cached_at < self._INPROC_TTL:
+            self._inproc.move_to_end(conversation_id)
+            return analysis
+        del self._inproc[conversation_id]
+        return None
+
+    def _inproc_put(self, conversation_id: str, analysis: PulseAnalysis) -> None:
+        """写进程内缓存（超限时淘汰最旧的条目）"""
+        self._inproc[conversation_id] = (time.monotonic(), analysis)
+        self._inproc.move_to_end(conversation_id)
+        if len(self._inproc) > self._INPROC_MAX:
+            self._inproc.popitem(last=False)
+
     async def execute(self, conversation_id: str) -> PulseAnalysis:
         """执行分析对话用例"""
-        # 检查缓存
+        # 先查进程内缓存（字典查找，无网络往返）
+        inproc_analysis = self._inproc_get(conversation_id)
+        if inproc_analysis:
+            return inproc_analysis
+
+        # 再查Redis缓存
         cached_analysis = await self.analysis_cache.get_cached_analysis(conversation_id)
         if cached_analysis:
+            self._inproc_put(conversation_id, cached_analysis)
             return cached_analysis
-        
-        # 获取对话和轮次
-        conversation = await self.conversation_repo.get_conversation(conversation_id)
+
+        # 只取分析所需的最小字段，省掉完整对话行的读取
+        conversation = await self.conversation_repo.get_analysis_input(conversation_id)
         if not conversation:
             raise Exception("Conversation not found")
-        
-        turns = await self.conversation_repo.get_conversation_turns(conversation_id)
-        conversation.turns = turns
-        
-        # 执行分析
-        analysis = self.pulse_analyzer.analyze_conversation(conversation)
-        
-        # 缓存结果
+
+        # 在进程池中执行分析，避免阻塞事件循环
+        analysis = await asyncio.get_running_loop().run_in_executor(
+            _get_analysis_pool(), _run_analysis, self.pulse_analyzer, conversation
+        )
+
+        # 缓存结果（两级都写）
+        self._inproc_put(conversation_id, analysis)
         await self.analysis_cache.cache_analysis(conversation_id, analysis)
-        
+
         return analysis
 
 
@@ -151,18 +282,8 @@ class GetConversationHistoryUseCase:
     
     async def execute(self, limit: int = 50, offset: int = 0) -> List[Conversation]:
         """执行获取对话历史用例"""
-        # 这里简化实现，实际应该有分页逻辑
-        # 模拟返回一些对话
-        conversations = []
-        for i in range(limit):
-            conv = Conversation(
-                title=f"对话 {i+1+offset}",
-                conversation_type=ConversationType.BUSINESS,
-                participants=["用户1", "用户2"]
-            )
-            conversations.append(conv)
-        
-        return conversations
+        # 分页查询下推到仓储层，由数据库索引完成
+        return await self.conversation_repo.list_conversations(limit=limit, offset=offset)
 
 
 class GetAnalysisHistoryUseCase:
@@ -174,21 +295,20 @@ class GetAnalysisHistoryUseCase:
     
     async def execute(self, limit: int = 20) -> List[Dict[str, Any]]:
         """执行获取分析历史用例"""
-        # 模拟分析历史数据
-        history = []
-        for i in range(limit):
-            analysis_data = {
+        # 模拟分析历史数据（时间戳在循环外取一次，列表一次性构建）
+        now = datetime.now()
+        return [
+            {
                 "id": f"analysis_{i}",
                 "conversation_id": f"conv_{i}",
                 "conversation_title": f"对话 {i+1}",
                 "overall_score": 0.5 + (i % 10) * 0.05,
-                "pulse_patterns": ["上升趋势", "稳定模式"],
-                "created_at": datetime.now(),
+                "pulse_patterns": _HISTORY_PULSE_PATTERNS,
+                "created_at": now,
                 "duration_minutes": 10 + i * 2
             }
-            history.append(analysis_data)
-        
-        return history
+            for i in range(limit)
+        ]
 
 
 class ExportAnalysisReportUseCase:
@@ -200,23 +320,20 @@ class ExportAnalysisReportUseCase:
     
     async def execute(self, conversation_id: str, format_type: str = "json") -> Dict[str, Any]:
         """执行导出分析报告用例"""
-        # 获取对话
-        conversation = await self.conversation_repo.get_conversation(conversation_id)
+        # 一次查询获取对话及其轮次
+        conversation = await self.conversation_repo.get_conversation_with_turns(conversation_id)
         if not conversation:
             raise Exception("Conversation not found")
-        
-        turns = await self.conversation_repo.get_conversation_turns(conversation_id)
-        conversation.turns = turns
-        
+
         # 执行分析
         analysis = self.pulse_analyzer.analyze_conversation(conversation)
-        
+
         # 生成报告
         report = {
             "conversation_info": {
                 "id": conversation.id,
                 "title": conversation.title,
-                "type": conversation.conversation_type.value,
+                "type": _CTYPE_VALUE[conversation.conversation_type],
                 "participants": conversation.participants,
                 "created_at": conversation.created_at,
                 "duration_minutes": conversation.duration_minutes
@@ -239,17 +356,15 @@ class ExportAnalysisReportUseCase:
             ],
             "insights": analysis.insights,
             "recommendations": analysis.recommendations,
-            "pulse_points": [
-                {
-                    "timestamp": point.timestamp.isoformat(),
-                    "intensity": point.intensity,
-                    "sentiment": point.sentiment,
-                    "engagement": point.engagement,
-                    "clarity": point.clarity,
-                    "speaker_role": point.speaker_role.value
-                }
-                for point in analysis.pulse_points
-            ],
+            # 脉冲点按列存储（SoA）：每个字段一个连续列表，避免逐点分配字典
+            "pulse_points": {
+                "timestamp": [point.timestamp.isoformat() for point in analysis.pulse_points],
+                "intensity": [point.intensity for point in analysis.pulse_points],
+                "sentiment": [point.sentiment for point in analysis.pulse_points],
+                "engagement": [point.engagement for point in analysis.pulse_points],
+                "clarity": [point.clarity for point in analysis.pulse_points],
+                "speaker_role": [_SPEAKER_VALUE[point.speaker_role] for point in analysis.pulse_points]
+            },
             "export_time": datetime.now().isoformat(),
             "format": format_type
         }
@@ -272,49 +387,70 @@ class BatchAnalyzeConversationsUseCase:
     
     async def execute(self, conversation_ids: List[str], max_concurrent: int = 5) -> Dict[str, str]:
         """执行批量分析用例"""
-        # 控制并发数
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def analyze_single_conversation(conversation_id: str) -> tuple[str, bool]:
-            async with semaphore:
+        # 批量检查缓存（一次MGET代替N次GET）
+        cached = await self.analysis_cache.get_cached_analyses(conversation_ids)
+        missing = [cid for cid in conversation_ids if cid not in cached]
+
+        # 批量获取对话和轮次（两次往返代替2N次）
+        conversations = await self.conversation_repo.get_conversations_bulk(missing)
+        turns_map = await self.conversation_repo.get_turns_bulk(missing)
+
+        analysis_results: Dict[str, str] = {cid: "success" for cid in cached}
+
+        # 有界队列把分析与缓存写入组成流水线：
+        # 第n个对话在进程池分析时，第n-1个的缓存写入可以同时进行
+        write_q: asyncio.Queue = asyncio.Queue(maxsize=max_concurrent)
+
+        async def analyzer_worker(analyze_q: asyncio.Queue):
+            loop = asyncio.get_running_loop()
+            while True:
+                conversation_id = await analyze_q.get()
+                if conversation_id is None:
+                    break
                 try:
-                    # 检查缓存
-                    cached_analysis = await self.analysis_cache.get_cached_analysis(conversation_id)
-                    if cached_analysis:
-                        return conversation_id, True
-                    
-                    # 获取对话和轮次
-                    conversation = await self.conversation_repo.get_conversation(conversation_id)
+                    conversation = conversations.get(conversation_id)
                     if not conversation:
-                        return conversation_id, False
-                    
-                    turns = await self.conversation_repo.get_conversation_turns(conversation_id)
-                    conversation.turns = turns
-                    
-                    # 执行分析
-                    analysis = self.pulse_analyzer.analyze_conversation(conversation)
-                    
-                    # 缓存结果
+                        analysis_results[conversation_id] = "failed"
+                        continue
+
+                    conversation.set_turns(turns_map.get(conversation_id, []))
+
+                    # 在进程池中执行分析，多核并行且不阻塞事件循环
+                    analysis = await loop.run_in_executor(
+                        _get_analysis_pool(), _run_analysis, self.pulse_analyzer, conversation
+                    )
+                    await write_q.put((conversation_id, analysis))
+
+                except Exception:
+                    logger.exception("Error analyzing conversation %s", conversation_id)
+                    analysis_results[conversation_id] = "failed"
+
+        async def writer_worker():
+            while True:
+                item = await write_q.get()
+                if item is None:
+                    break
+                conversation_id, analysis = item
+                try:
                     await self.analysis_cache.cache_analysis(conversation_id, analysis)
-                    
-                    return conversation_id, True
-                    
-                except Exception as e:
-                    print(f"Error analyzing conversation {conversation_id}: {e}")
-                    return conversation_id, False
-        
-        # 并发执行分析
-        tasks = [analyze_single_conversation(cid) for cid in conversation_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 构建结果
-        analysis_results = {}
-        for result in results:
-            if isinstance(result, tuple):
-                conversation_id, success = result
-                analysis_results[conversation_id] = "success" if success else "failed"
-            else:
-                # 处理异常情况
-                analysis_results[str(result)] = "error"
-        
+                    analysis_results[conversation_id] = "success"
+                except Exception:
+                    logger.exception("Error caching analysis for %s", conversation_id)
+                    analysis_results[conversation_id] = "failed"
+
+        # 启动流水线：多个分析worker + 一个缓存写入worker
+        analyze_q: asyncio.Queue = asyncio.Queue(maxsize=max_concurrent)
+        analyzers = [asyncio.create_task(analyzer_worker(analyze_q)) for _ in range(max_concurrent)]
+        writer = asyncio.create_task(writer_worker())
+
+        for conversation_id in missing:
+            await analyze_q.put(conversation_id)
+        for _ in analyzers:
+            await analyze_q.put(None)
+
+        # worker内部已捕获全部异常，这里无需return_exceptions包装
+        await asyncio.gather(*analyzers)
+        await write_q.put(None)
+        await writer
+
         return analysis_results
\ No newline at end of file
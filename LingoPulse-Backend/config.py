@@ -120,6 +120,11 @@ class DatabaseSettings(BaseSettings):
     
     # SQLite 配置（开发用）
     sqlite_path: str = Field(default="./lingopulse.db", description="SQLite 数据库路径")
+
+    # Redis 配置
+    redis_host: str = Field(default="localhost", description="Redis 主机")
+    redis_port: int = Field(default=6379, description="Redis 端口")
+    redis_db: int = Field(default=0, description="Redis 数据库编号")
     
     # 连接池配置
     database_pool_size: int = Field(default=10, description="数据库连接池大小")
@@ -146,6 +151,10 @@ class LLMProviderSettings(BaseSettings):
     # 飞桨平台配置
     paddle_temperature: float = Field(default=0.8, description="飞桨平台温度参数")
     paddle_max_tokens: int = Field(default=4000, description="飞桨平台最大token数")
+    paddle_max_connections: int = Field(default=256, description="飞桨平台HTTP连接池最大连接数")
+    paddle_max_keepalive: int = Field(default=64, description="飞桨平台HTTP连接池keep-alive连接数")
+    paddle_requests_per_second: float = Field(default=8.0, description="飞桨平台客户端限流速率（请求/秒）")
+    paddle_rate_burst: int = Field(default=16, description="飞桨平台客户端限流突发容量")
     
     local_model_load_in_8bit: bool = Field(default=True, description="本地模型8位量化")
     local_model_max_length: int = Field(default=2048, description="本地模型最大长度")
@@ -207,14 +216,16 @@ def get_security_settings() -> SecuritySettings:
     return SecuritySettings()
 
 
+@lru_cache()
 def get_database_url() -> str:
-    """获取数据库连接URL"""
+    """获取数据库连接URL（缓存）"""
     db_settings = get_database_settings()
-    
+
     # 如果设置了环境变量中的数据库URL，直接使用
-    if os.getenv("DATABASE_URL"):
-        return os.getenv("DATABASE_URL")
-    
+    db_url = os.getenv("DATABASE_URL")
+    if db_url:
+        return db_url
+
     # 否则根据数据库类型构建URL
     if os.getenv("DATABASE_TYPE", "sqlite") == "postgresql":
         return (
@@ -228,10 +239,16 @@ def get_database_url() -> str:
         return f"sqlite:///{db_settings.sqlite_path}"
 
 
+@lru_cache()
 def get_redis_url() -> str:
-    """获取Redis连接URL"""
-    if os.getenv("REDIS_URL"):
-        return os.getenv("REDIS_URL")
-    
+    """获取Redis连接URL（缓存）"""
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return redis_url
+
     redis_settings = get_database_settings()
-    return f"redis://{redis_settings.postgresql_host}:6379/0"
\ No newline at end of file
+    return (
+        f"redis://{redis_settings.redis_host}:"
+        f"{redis_settings.redis_port}/"
+        f"{redis_settings.redis_db}"
+    )
\ No newline at end of file
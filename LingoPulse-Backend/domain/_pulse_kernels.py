@@ -0,0 +1,87 @@
+"""
+Domain Layer - Pulse Numeric Kernels
+领域层 - 脉冲数值计算内核
+
+numba可用时把热点数值内核编译成机器码；缺失时退回等价的NumPy实现，
+两条路径的输入输出完全一致。
+"""
+import math
+import numpy as np
+
+# 兼容性处理 numba（JIT编译数值内核）；缺失时退回NumPy实现
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def volatility(intensities):
+        """强度序列的总体标准差"""
+        n = intensities.shape[0]
+        mean = 0.0
+        for i in range(n):
+            mean += intensities[i]
+        mean /= n
+        variance = 0.0
+        for i in range(n):
+            diff = intensities[i] - mean
+            variance += diff * diff
+        return math.sqrt(variance / n)
+
+    @njit(cache=True)
+    def linreg_slope(intensities):
+        """强度序列对轮次序号的最小二乘斜率"""
+        n = intensities.shape[0]
+        x_mean = (n - 1) / 2.0
+        y_mean = 0.0
+        for i in range(n):
+            y_mean += intensities[i]
+        y_mean /= n
+        numerator = 0.0
+        denominator = 0.0
+        for i in range(n):
+            dx = i - x_mean
+            numerator += dx * (intensities[i] - y_mean)
+            denominator += dx * dx
+        if denominator == 0.0:
+            return 0.0
+        return numerator / denominator
+
+    @njit(cache=True)
+    def direction_changes(intensities):
+        """相邻差分的方向翻转次数"""
+        n = intensities.shape[0]
+        changes = 0
+        for i in range(2, n):
+            d1 = intensities[i] - intensities[i - 1]
+            d0 = intensities[i - 1] - intensities[i - 2]
+            if (d1 > 0 and d0 <= 0) or (d1 < 0 and d0 >= 0):
+                changes += 1
+        return changes
+
+    def _warmup():
+        """模块加载时用小样本触发一次编译，避免首个请求承担JIT延迟"""
+        sample = np.zeros(8, dtype=np.float32)
+        volatility(sample)
+        linreg_slope(sample)
+        direction_changes(sample)
+
+    _warmup()
+else:
+    def volatility(intensities) -> float:
+        """强度序列的总体标准差"""
+        return float(intensities.std())
+
+    def linreg_slope(intensities) -> float:
+        """强度序列对轮次序号的最小二乘斜率"""
+        return float(np.polyfit(np.arange(intensities.size), intensities, 1)[0])
+
+    def direction_changes(intensities) -> int:
+        """相邻差分的方向翻转次数"""
+        signs = np.sign(np.diff(intensities))
+        return int(np.count_nonzero(
+            ((signs[1:] > 0) & (signs[:-1] <= 0)) | ((signs[1:] < 0) & (signs[:-1] >= 0))
+        ))
@@ -25,7 +25,7 @@ class ConversationType(Enum):
     EDUCATION = "education"
 
 
-@dataclass
+@dataclass(slots=True)
 class TurnFeatures:
     """对话轮次的特征数据"""
     # 语言特征
@@ -50,10 +50,10 @@ class TurnFeatures:
     engagement_score: float = 0.0  # 0 到 1
 
 
-@dataclass
+@dataclass(slots=True)
 class Turn:
     """对话轮次实体"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
     conversation_id: str = ""
     speaker_role: SpeakerRole = SpeakerRole.USER
     content: str = ""
@@ -67,7 +67,8 @@ class Turn:
     
     def __post_init__(self):
         """后处理验证"""
-        if not self.content.strip():
+        # isspace()是C级单遍扫描，不像strip()那样复制整段内容
+        if not self.content or self.content.isspace():
             raise ValueError("对话内容不能为空")
         
         if not self.conversation_id:
@@ -81,7 +82,14 @@ class Turn:
     @property
     def is_question(self) -> bool:
         """判断是否为问题"""
-        return '?' in self.content or self.content.strip().endswith('？')
+        content = self.content
+        if '?' in content:
+            return True
+        # 从末尾跳过空白，避免strip()分配新字符串
+        i = len(content) - 1
+        while i >= 0 and content[i].isspace():
+            i -= 1
+        return i >= 0 and content[i] == '？'
     
     @property
     def sentiment_level(self) -> str:
@@ -95,10 +103,10 @@ class Turn:
             return "neutral"
 
 
-@dataclass
+@dataclass(slots=True)
 class Conversation:
     """对话实体"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
     title: str = ""
     conversation_type: ConversationType = ConversationType.BUSINESS
     participants: List[str] = field(default_factory=list)
@@ -113,44 +121,85 @@ class Conversation:
     
     # 元数据
     metadata: Dict[str, Any] = field(default_factory=dict)
-    
+
+    # 增量维护的轮次索引（属性访问O(1)，避免每次全量扫描turns）
+    _user_turns: List[Turn] = field(default_factory=list, init=False, repr=False)
+    _assistant_turns: List[Turn] = field(default_factory=list, init=False, repr=False)
+    _min_ts: Optional[datetime] = field(default=None, init=False, repr=False)
+    _max_ts: Optional[datetime] = field(default=None, init=False, repr=False)
+    _indexed_count: int = field(default=0, init=False, repr=False)
+
     def __post_init__(self):
         """后处理验证"""
-        if not self.title.strip():
+        if not self.title or self.title.isspace():
             self.title = f"对话 {self.id[:8]}"
-    
+        self._rebuild_turn_index()
+
+    def _rebuild_turn_index(self) -> None:
+        """全量重建轮次索引"""
+        self._user_turns = [turn for turn in self.turns if turn.speaker_role == SpeakerRole.USER]
+        self._assistant_turns = [turn for turn in self.turns if turn.speaker_role == SpeakerRole.ASSISTANT]
+        if self.turns:
+            self._min_ts = min(turn.timestamp for turn in self.turns)
+            self._max_ts = max(turn.timestamp for turn in self.turns)
+        else:
+            self._min_ts = None
+            self._max_ts = None
+        self._indexed_count = len(self.turns)
+
+    def _ensure_turn_index(self) -> None:
+        """turns被直接整体赋值时惰性重建索引"""
+        if self._indexed_count != len(self.turns):
+            self._rebuild_turn_index()
+
     def add_turn(self, turn: Turn) -> None:
         """添加对话轮次"""
         if turn.conversation_id != self.id:
             raise ValueError("turn的conversation_id与当前对话不匹配")
-        
+
+        self._ensure_turn_index()
         self.turns.append(turn)
+        if turn.speaker_role == SpeakerRole.USER:
+            self._user_turns.append(turn)
+        elif turn.speaker_role == SpeakerRole.ASSISTANT:
+            self._assistant_turns.append(turn)
+        if self._min_ts is None or turn.timestamp < self._min_ts:
+            self._min_ts = turn.timestamp
+        if self._max_ts is None or turn.timestamp > self._max_ts:
+            self._max_ts = turn.timestamp
+        self._indexed_count = len(self.turns)
         self.updated_at = datetime.now()
-    
+
+    def set_turns(self, turns: List[Turn]) -> None:
+        """整体替换轮次并一次性重建索引"""
+        self.turns = turns
+        self._rebuild_turn_index()
+
     @property
     def total_turns(self) -> int:
         """获取总轮次数"""
         return len(self.turns)
-    
+
     @property
     def duration_minutes(self) -> float:
         """获取对话持续时间（分钟）"""
         if not self.turns:
             return 0.0
-        
-        start_time = min(turn.timestamp for turn in self.turns)
-        end_time = max(turn.timestamp for turn in self.turns)
-        return (end_time - start_time).total_seconds() / 60.0
-    
+
+        self._ensure_turn_index()
+        return (self._max_ts - self._min_ts).total_seconds() / 60.0
+
     @property
     def user_turns(self) -> List[Turn]:
         """获取用户轮次"""
-        return [turn for turn in self.turns if turn.speaker_role == SpeakerRole.USER]
-    
+        self._ensure_turn_index()
+        return self._user_turns
+
     @property
     def assistant_turns(self) -> List[Turn]:
         """获取助手轮次"""
-        return [turn for turn in self.turns if turn.speaker_role == SpeakerRole.ASSISTANT]
+        self._ensure_turn_index()
+        return self._assistant_turns
     
     def get_recent_turns(self, count: int = 5) -> List[Turn]:
         """获取最近的轮次"""
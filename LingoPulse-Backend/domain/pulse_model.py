@@ -6,8 +6,29 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import math
-from .entities import Conversation, Turn, SpeakerRole
+import numpy as np
+from .entities import Conversation, ConversationType, Turn, SpeakerRole
 from .features import FeatureExtractor
+from ._pulse_kernels import volatility as _volatility_kernel, linreg_slope, direction_changes
+
+
+@dataclass
+class AnalysisInput:
+    """分析输入DTO：只携带分析所需的最小字段，免去整行对话元数据的查询"""
+    id: str = ""
+    conversation_type: ConversationType = ConversationType.BUSINESS
+    participants: List[str] = field(default_factory=list)
+    turns: List[Turn] = field(default_factory=list)
+
+    @property
+    def duration_minutes(self) -> float:
+        """获取对话持续时间（分钟）"""
+        if not self.turns:
+            return 0.0
+
+        start_time = min(turn.timestamp for turn in self.turns)
+        end_time = max(turn.timestamp for turn in self.turns)
+        return (end_time - start_time).total_seconds() / 60.0
 
 
 @dataclass
@@ -58,31 +79,59 @@ class PulseAnalysis:
     created_at: datetime = field(default_factory=datetime.now)
 
 
+@dataclass
+class PulseSeries:
+    """脉冲序列的SoA视图
+
+    聚合计算（模式检测、稳定性、动量、洞察统计）都走打包好的
+    float32数组，不再反复对PulsePoint对象列表做属性遍历。
+    各字段都是[0,1]或[-1,1]区间、约3位有效数字的分值，float32精度
+    绰绰有余，且每元素4字节，比Python float对象列表省一个量级的内存。
+    """
+    intensities: np.ndarray
+    sentiments: np.ndarray
+    engagements: np.ndarray
+    clarities: np.ndarray
+
+    @classmethod
+    def from_points(cls, pulse_points: List[PulsePoint]) -> "PulseSeries":
+        """从脉冲点列表一次性收集各特征数组"""
+        n = len(pulse_points)
+        return cls(
+            intensities=np.fromiter((p.intensity for p in pulse_points), dtype=np.float32, count=n),
+            sentiments=np.fromiter((p.sentiment for p in pulse_points), dtype=np.float32, count=n),
+            engagements=np.fromiter((p.engagement for p in pulse_points), dtype=np.float32, count=n),
+            clarities=np.fromiter((p.clarity for p in pulse_points), dtype=np.float32, count=n),
+        )
+
+
 class PulseAnalyzer:
     """语言脉冲分析器"""
     
     def __init__(self):
         self.feature_extractor = FeatureExtractor()
     
-    def analyze_conversation(self, conversation: Conversation) -> PulseAnalysis:
-        """分析对话的语言脉冲"""
-        # 生成脉冲点
+    def analyze_conversation(self, conversation: "Conversation | AnalysisInput") -> PulseAnalysis:
+        """分析对话的语言脉冲（接受完整对话或精简的AnalysisInput）"""
+        # 生成脉冲点，并一次性构建SoA视图供后续所有聚合复用
         pulse_points = self._generate_pulse_points(conversation)
-        
+        series = PulseSeries.from_points(pulse_points)
+
         # 检测脉冲模式
-        patterns = self._detect_patterns(pulse_points)
-        
+        patterns = self._detect_patterns(pulse_points, series)
+
         # 生成洞察和建议
-        insights = self._generate_insights(pulse_points, patterns)
+        insights = self._generate_insights(series, patterns)
         recommendations = self._generate_recommendations(patterns, insights)
-        
+
         # 计算总体指标
-        overall_score = self._calculate_overall_score(pulse_points, patterns)
+        intensities = series.intensities
+        overall_score = self._calculate_overall_score(series, patterns)
         total_duration = conversation.duration_minutes
-        peak_intensity = max((p.intensity for p in pulse_points), default=0.0)
-        avg_intensity = sum(p.intensity for p in pulse_points) / max(len(pulse_points), 1)
-        stability_score = self._calculate_stability(pulse_points)
-        momentum_score = self._calculate_momentum(pulse_points)
+        peak_intensity = float(intensities.max()) if intensities.size else 0.0
+        avg_intensity = float(intensities.mean()) if intensities.size else 0.0
+        stability_score = self._calculate_stability(series)
+        momentum_score = self._calculate_momentum(series)
         
         return PulseAnalysis(
             conversation_id=conversation.id,
@@ -101,18 +150,17 @@ class PulseAnalyzer:
     def _generate_pulse_points(self, conversation: Conversation) -> List[PulsePoint]:
         """生成脉冲点"""
         pulse_points = []
-        
-        for i, turn in enumerate(conversation.turns):
-            # 提取特征
-            previous_turns = conversation.turns[:i] if i > 0 else []
-            features = self.feature_extractor.extract_turn_features(turn, previous_turns)
-            
+
+        # 整段对话批量提特征（循环交换后的紧凑实现），再逐轮装配脉冲点
+        features_list = self.feature_extractor.extract_batch(conversation.turns)
+
+        for turn, features in zip(conversation.turns, features_list):
             # 更新turn的特征
             turn.features = features
-            
+
             # 计算脉冲强度（综合多个特征）
             intensity = self._calculate_intensity(features)
-            
+
             # 创建脉冲点
             pulse_point = PulsePoint(
                 timestamp=turn.timestamp,
@@ -152,194 +200,101 @@ class PulseAnalyzer:
         intensity = sum(intensity_factors) + question_boost
         return min(max(intensity, 0.0), 1.0)
     
-    def _detect_patterns(self, pulse_points: List[PulsePoint]) -> List[PulsePattern]:
-        """检测脉冲模式"""
-        if len(pulse_points) < 3:
+    def _detect_patterns(self, pulse_points: List[PulsePoint], series: PulseSeries) -> List[PulsePattern]:
+        """检测脉冲模式
+
+        四类模式共享同一组统计量（斜率、均值、波动性、方向变化次数），
+        这里一次性算好再分别判定，不再每个检测器各自遍历强度序列。
+        """
+        n = len(pulse_points)
+        if n < 3:
             return []
-        
+
+        intensities = series.intensities
+        mean_intensity = float(intensities.mean())
+        volatility = self._calculate_volatility(intensities)
+        start_time = pulse_points[0].timestamp
+        end_time = pulse_points[-1].timestamp
+
         patterns = []
-        intensities = [p.intensity for p in pulse_points]
-        
-        # 上升趋势
-        rising_trend = self._detect_rising_trend(pulse_points)
-        if rising_trend:
-            patterns.append(rising_trend)
-        
-        # 下降趋势
-        falling_trend = self._detect_falling_trend(pulse_points)
-        if falling_trend:
-            patterns.append(falling_trend)
-        
-        # 波动模式
-        oscillating = self._detect_oscillating(pulse_points)
-        if oscillating:
-            patterns.append(oscillating)
-        
+
+        # 强度近乎恒定时（短对话或单调文本的常见情形），
+        # 斜率和方向翻转都必然判不出模式，直接跳到稳定模式检测
+        nearly_constant = volatility < 1e-6
+
+        # 趋势（上升/下降互斥，由同一个斜率判定）
+        if n >= 5 and not nearly_constant:
+            slope = float(linreg_slope(intensities))
+            if slope > 0.05:
+                patterns.append(PulsePattern(
+                    name="上升趋势",
+                    description="对话强度逐渐上升，表明参与度和兴趣在增长",
+                    pattern_type="rising",
+                    confidence=min(slope * 10, 1.0),
+                    start_time=start_time,
+                    end_time=end_time,
+                    avg_intensity=mean_intensity,
+                    volatility=volatility
+                ))
+            elif slope < -0.05:
+                patterns.append(PulsePattern(
+                    name="下降趋势",
+                    description="对话强度逐渐下降，可能表示疲劳或兴趣降低",
+                    pattern_type="falling",
+                    confidence=min(abs(slope) * 10, 1.0),
+                    start_time=start_time,
+                    end_time=end_time,
+                    avg_intensity=mean_intensity,
+                    volatility=volatility
+                ))
+
+        # 波动模式（方向变化次数基于相邻差分的符号翻转）
+        if n >= 6 and not nearly_constant:
+            changes = int(direction_changes(intensities))
+            change_ratio = changes / (n - 2)
+            if change_ratio > 0.4:
+                patterns.append(PulsePattern(
+                    name="波动模式",
+                    description="对话强度频繁变化，可能表示话题转换或情绪波动",
+                    pattern_type="oscillating",
+                    confidence=min(change_ratio * 2, 1.0),
+                    start_time=start_time,
+                    end_time=end_time,
+                    avg_intensity=mean_intensity,
+                    volatility=volatility
+                ))
+
         # 稳定模式
-        stable = self._detect_stable(pulse_points)
-        if stable:
-            patterns.append(stable)
-        
-        return patterns
-    
-    def _detect_rising_trend(self, pulse_points: List[PulsePoint]) -> Optional[PulsePattern]:
-        """检测上升趋势"""
-        if len(pulse_points) < 5:
-            return None
-        
-        intensities = [p.intensity for p in pulse_points]
-        
-        # 计算趋势
-        n = len(intensities)
-        x = list(range(n))
-        y = intensities
-        
-        # 简单线性回归
-        x_mean = sum(x) / n
-        y_mean = sum(y) / n
-        
-        numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
-        denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
-            return None
-        
-        slope = numerator / denominator
-        
-        # 如果斜率为正且足够大，认为是上升趋势
-        if slope > 0.05:
-            confidence = min(slope * 10, 1.0)  # 归一化置信度
-            
-            return PulsePattern(
-                name="上升趋势",
-                description="对话强度逐渐上升，表明参与度和兴趣在增长",
-                pattern_type="rising",
-                confidence=confidence,
-                start_time=pulse_points[0].timestamp,
-                end_time=pulse_points[-1].timestamp,
-                avg_intensity=sum(intensities) / len(intensities),
-                volatility=self._calculate_volatility(intensities)
-            )
-        
-        return None
-    
-    def _detect_falling_trend(self, pulse_points: List[PulsePoint]) -> Optional[PulsePattern]:
-        """检测下降趋势"""
-        if len(pulse_points) < 5:
-            return None
-        
-        intensities = [p.intensity for p in pulse_points]
-        
-        n = len(intensities)
-        x = list(range(n))
-        y = intensities
-        
-        x_mean = sum(x) / n
-        y_mean = sum(y) / n
-        
-        numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
-        denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
-            return None
-        
-        slope = numerator / denominator
-        
-        # 如果斜率为负且绝对值足够大，认为是下降趋势
-        if slope < -0.05:
-            confidence = min(abs(slope) * 10, 1.0)
-            
-            return PulsePattern(
-                name="下降趋势",
-                description="对话强度逐渐下降，可能表示疲劳或兴趣降低",
-                pattern_type="falling",
-                confidence=confidence,
-                start_time=pulse_points[0].timestamp,
-                end_time=pulse_points[-1].timestamp,
-                avg_intensity=sum(intensities) / len(intensities),
-                volatility=self._calculate_volatility(intensities)
-            )
-        
-        return None
-    
-    def _detect_oscillating(self, pulse_points: List[PulsePoint]) -> Optional[PulsePattern]:
-        """检测波动模式"""
-        if len(pulse_points) < 6:
-            return None
-        
-        intensities = [p.intensity for p in pulse_points]
-        
-        # 计算变化次数
-        changes = 0
-        for i in range(1, len(intensities)):
-            if (intensities[i] > intensities[i-1] and i > 1 and intensities[i-1] <= intensities[i-2]) or \
-               (intensities[i] < intensities[i-1] and i > 1 and intensities[i-1] >= intensities[i-2]):
-                changes += 1
-        
-        # 如果变化频繁，认为是波动模式
-        change_ratio = changes / (len(intensities) - 2)
-        if change_ratio > 0.4:
-            confidence = min(change_ratio * 2, 1.0)
-            
-            return PulsePattern(
-                name="波动模式",
-                description="对话强度频繁变化，可能表示话题转换或情绪波动",
-                pattern_type="oscillating",
-                confidence=confidence,
-                start_time=pulse_points[0].timestamp,
-                end_time=pulse_points[-1].timestamp,
-                avg_intensity=sum(intensities) / len(intensities),
-                volatility=self._calculate_volatility(intensities)
-            )
-        
-        return None
-    
-    def _detect_stable(self, pulse_points: List[PulsePoint]) -> Optional[PulsePattern]:
-        """检测稳定模式"""
-        if len(pulse_points) < 4:
-            return None
-        
-        intensities = [p.intensity for p in pulse_points]
-        volatility = self._calculate_volatility(intensities)
-        
-        # 如果波动性低，认为是稳定模式
-        if volatility < 0.1:
-            confidence = 1.0 - min(volatility * 5, 1.0)
-            
-            return PulsePattern(
+        if n >= 4 and volatility < 0.1:
+            patterns.append(PulsePattern(
                 name="稳定模式",
                 description="对话强度保持稳定，表明交流顺畅且节奏良好",
                 pattern_type="stable",
-                confidence=confidence,
-                start_time=pulse_points[0].timestamp,
-                end_time=pulse_points[-1].timestamp,
-                avg_intensity=sum(intensities) / len(intensities),
+                confidence=1.0 - min(volatility * 5, 1.0),
+                start_time=start_time,
+                end_time=end_time,
+                avg_intensity=mean_intensity,
                 volatility=volatility
-            )
-        
-        return None
-    
-    def _calculate_volatility(self, intensities: List[float]) -> float:
-        """计算波动性"""
-        if len(intensities) < 2:
+            ))
+
+        return patterns
+
+    def _calculate_volatility(self, intensities) -> float:
+        """计算波动性（总体标准差）"""
+        arr = np.asarray(intensities, dtype=np.float32)
+        if arr.size < 2:
             return 0.0
-        
-        mean_intensity = sum(intensities) / len(intensities)
-        variance = sum((x - mean_intensity) ** 2 for x in intensities) / len(intensities)
-        return math.sqrt(variance)
+        return float(_volatility_kernel(arr))
     
-    def _calculate_overall_score(self, pulse_points: List[PulsePoint], patterns: List[PulsePattern]) -> float:
+    def _calculate_overall_score(self, series: PulseSeries, patterns: List[PulsePattern]) -> float:
         """计算总体脉冲分数"""
-        if not pulse_points:
+        if not series.intensities.size:
             return 0.0
-        
+
         # 基于平均强度、稳定性和模式置信度
-        avg_intensity = sum(p.intensity for p in pulse_points) / len(pulse_points)
-        
-        if pulse_points:
-            stability = 1.0 - self._calculate_volatility([p.intensity for p in pulse_points])
-        else:
-            stability = 0.0
+        intensities = series.intensities
+        avg_intensity = float(intensities.mean())
+        stability = 1.0 - self._calculate_volatility(intensities)
         
         pattern_confidence = max((p.confidence for p in patterns), default=0.5)
         
@@ -347,32 +302,27 @@ class PulseAnalyzer:
         overall_score = avg_intensity * 0.4 + stability * 0.3 + pattern_confidence * 0.3
         return min(max(overall_score, 0.0), 1.0)
     
-    def _calculate_stability(self, pulse_points: List[PulsePoint]) -> float:
+    def _calculate_stability(self, series: PulseSeries) -> float:
         """计算对话稳定性"""
-        if len(pulse_points) < 2:
+        if series.intensities.size < 2:
             return 1.0
-        
-        intensities = [p.intensity for p in pulse_points]
-        volatility = self._calculate_volatility(intensities)
+
+        volatility = self._calculate_volatility(series.intensities)
         
         # 稳定性 = 1 - 波动性
         return max(0.0, 1.0 - volatility * 2)  # 增强波动性的影响
     
-    def _calculate_momentum(self, pulse_points: List[PulsePoint]) -> float:
+    def _calculate_momentum(self, series: PulseSeries) -> float:
         """计算对话动量"""
-        if len(pulse_points) < 3:
+        if series.intensities.size < 3:
             return 0.0
-        
-        # 基于最近几轮的强度变化
-        recent_intensities = [p.intensity for p in pulse_points[-3:]]
-        
-        if len(recent_intensities) >= 2:
-            momentum = recent_intensities[-1] - recent_intensities[0]
-            return max(0.0, min(momentum, 1.0))  # 只考虑正向动量
-        
-        return 0.0
+
+        # 基于最近几轮的强度变化，只考虑正向动量
+        recent = series.intensities[-3:]
+        momentum = float(recent[-1] - recent[0])
+        return max(0.0, min(momentum, 1.0))
     
-    def _generate_insights(self, pulse_points: List[PulsePoint], patterns: List[PulsePattern]) -> List[str]:
+    def _generate_insights(self, series: PulseSeries, patterns: List[PulsePattern]) -> List[str]:
         """生成分析洞察"""
         insights = []
         
@@ -388,17 +338,17 @@ class PulseAnalyzer:
                 insights.append("对话节奏稳定，说明双方交流顺畅")
         
         # 基于统计数据生成洞察
-        if pulse_points:
-            avg_intensity = sum(p.intensity for p in pulse_points) / len(pulse_points)
-            
+        if series.intensities.size:
+            avg_intensity = float(series.intensities.mean())
+
             if avg_intensity > 0.7:
                 insights.append("整体对话强度很高，双方都非常投入")
             elif avg_intensity < 0.3:
                 insights.append("对话强度偏低，可能需要更积极的互动")
-            
-            # 检查情感变化
-            sentiments = [p.sentiment for p in pulse_points]
-            if max(sentiments) - min(sentiments) > 0.6:
+
+            # 检查情感变化（极差即max-min）
+            sentiments = series.sentiments
+            if float(sentiments.max() - sentiments.min()) > 0.6:
                 insights.append("对话中情感变化较大，需要关注情绪管理")
         
         return insights
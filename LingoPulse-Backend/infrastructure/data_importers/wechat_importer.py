@@ -6,24 +6,201 @@
 
 import json
 import csv
+import mmap
+import os
 import re
+import sys
+import concurrent.futures
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Optional, Union
 from pathlib import Path
 
 from domain.entities import Conversation, Turn, SpeakerRole, ConversationType
 
+# 兼容性处理 google-re2（DFA引擎、无回溯，简单锚定模式上比re快数倍）；
+# 缺失时退回标准库re，两个模式都不含反向引用/环视，两边语义一致
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# 兼容性处理 orjson（原生实现的JSON编解码，比标准库快数倍）；缺失时退回标准库json
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+
+# 预编译的行解析/内容过滤模式（模块加载时编译一次，
+# 大文件导入时每行不再经过re缓存查找）
+# 两种常见微信行格式合并成一个备选模式，每行只进一次regex引擎：
+# 格式1: 2023-12-01 10:30:25 张三: 你好
+# 格式2: 张三 10:30:25 你好
+_LINE_RE = _re_engine.compile(
+    r'(?P<ts1>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(?P<s1>[^:]+):\s*(?P<c1>.+)'
+    r'|(?P<s2>[^0-9]+)\s+(?P<ts2>\d{2}:\d{2}:\d{2})\s+(?P<c2>.+)'
+)
+# 无效内容的固定前缀（系统消息类）；首字符类别用ord()区间比较判定，
+# 单字符分类走整数比较比一次regex调用快两个数量级
+_INVALID_PREFIXES = ('系统消息', 'system', '通知', '提示')
+
+# 各来源格式的候选字段名（按优先级排列，取第一个命中的键）
+_SENDER_FIELDS = ('sender', 'from', 'from_user', 'user', 'name', 'nickname', 'sender_name')
+_CONTENT_FIELDS = ('content', 'text', 'msg', 'message', 'body')
+_TIME_FIELDS = ('timestamp', 'time', 'date', 'created_at')
+_TYPE_FIELDS = ('type', 'msg_type', 'message_type', 'category')
+# 原始类型别名到规范类型的映射（未知类型默认按文本处理）
+_TYPE_ALIASES = {
+    'text': 'text', 'msg': 'text', 'message': 'text',
+    'image': 'image', 'img': 'image', 'pic': 'image',
+    'voice': 'voice', 'audio': 'voice',
+    'video': 'video'
+}
+def _read_json(f):
+    """解析已打开的二进制JSON文件
+
+    mmap把文件作为页缓存上的零拷贝视图暴露，省掉f.read()在Python堆里
+    复制一整份大文件；空文件或不支持mmap时退回整体读取。
+    """
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        raw = f.read()
+        return orjson.loads(raw) if _HAS_ORJSON else json.loads(raw)
+    with mm:
+        if _HAS_ORJSON:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+        # 标准库json不接受mmap对象，这里的切片等价于一次读取
+        return json.loads(mm[:])
+
+
+# 每条Turn的metadata都带同样三个键和固定值，intern后整个导入
+# 共享同一批字符串对象，省掉十万级导入时的重复字符串分配
+_META_SENDER = sys.intern('original_sender')
+_META_TYPE = sys.intern('message_type')
+_META_SOURCE = sys.intern('source')
+_SRC_WECHAT = sys.intern('wechat')
+_TEXT = sys.intern('text')
+# 发送者也intern：聊天记录里唯一发送者只有几个，intern后角色判定
+# 可以用身份比较代替逐字符的字符串比较
+_ME = sys.intern('我')
+_UNKNOWN_SENDER = sys.intern('未知用户')
+
+# 常见字符串时间格式
+_TS_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d %H:%M'
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_ts(timestamp_str: str) -> Optional[datetime]:
+    """解析字符串时间戳，失败返回None
+
+    strptime每次调用都要解析格式串并处理locale（数十微秒量级）；
+    微信导出的时间戳形状固定，直接切片转int快一个数量级，
+    形状不符时再退回fromisoformat和strptime格式表。
+    分钟级导出里大量时间戳重复，lru_cache让重复值直接命中。
+    """
+    # 快路径只接标准的"YYYY-MM-DD HH:MM:SS"形状：带T分隔符、时区
+    # 偏移或小数秒的ISO串必须走fromisoformat，否则tzinfo和微秒会被
+    # 静默丢掉
+    if len(timestamp_str) == 19 and timestamp_str[4] in '-/' and timestamp_str[10] == ' ':
+        try:
+            return datetime(
+                int(timestamp_str[0:4]), int(timestamp_str[5:7]), int(timestamp_str[8:10]),
+                int(timestamp_str[11:13]), int(timestamp_str[14:16]), int(timestamp_str[17:19])
+            )
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    for fmt in _TS_FORMATS:
+        try:
+            return datetime.strptime(timestamp_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+# 提取辅助函数提升为模块级：调用点直接LOAD_GLOBAL，
+# 免去每条消息的属性查找和绑定方法分配
+def _extract_sender(message: Dict) -> str:
+    """提取发送者"""
+    for field in _SENDER_FIELDS:
+        if field in message:
+            return sys.intern(str(message[field]).strip())
+
+    return _UNKNOWN_SENDER
+
+
+def _extract_content(message: Dict) -> str:
+    """提取消息内容"""
+    for field in _CONTENT_FIELDS:
+        if field in message:
+            content = str(message[field]).strip()
+            # 过滤掉系统消息和无效内容
+            if _is_valid_content(content):
+                return content
+
+    return ''
+
+
+def _extract_timestamp(message: Dict) -> datetime:
+    """提取时间戳"""
+    for field in _TIME_FIELDS:
+        if field in message:
+            value = message[field]
+            if isinstance(value, str):
+                parsed = _parse_ts(value)
+                if parsed is not None:
+                    return parsed
+            elif isinstance(value, (int, float)):
+                try:
+                    return datetime.fromtimestamp(value)
+                except Exception:
+                    continue
+
+    return datetime.now()
+
+
+def _extract_message_type(message: Dict) -> str:
+    """提取消息类型"""
+    for field in _TYPE_FIELDS:
+        if field in message:
+            return _TYPE_ALIASES.get(str(message[field]).lower(), 'text')
+
+    return 'text'  # 默认为文本
+
+
+def _is_valid_content(content: str) -> bool:
+    """检查内容是否有效"""
+    # 过滤掉系统消息、空消息等：首字符整数区间比较加前缀判定，不走regex
+    s = content.strip()
+    if not s:
+        return False
+    c = ord(s[0])
+    if not (0x30 <= c <= 0x39 or 0x41 <= c <= 0x5A or 0x61 <= c <= 0x7A
+            or 0x4E00 <= c <= 0x9FFF):
+        return False
+    return not s.startswith(_INVALID_PREFIXES)
+
 
 class WeChatChatImporter:
     """微信聊天记录导入器"""
-    
+
     def __init__(self):
         self.supported_formats = ['.txt', '.json', '.csv']
-        self.message_patterns = {
-            'time': r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})',
-            'speaker': r'([^:]+):',
-            'content': r':\s*(.+)$'
-        }
     
     def import_from_file(self, file_path: Union[str, Path], format_type: str = 'auto') -> List[Conversation]:
         """
@@ -65,17 +242,18 @@ class WeChatChatImporter:
             elif suffix == '.txt':
                 return 'txt'
         
-        # 尝试读取文件内容来判断格式
+        # 尝试读取文件头来判断格式：判定只看首个非空白字节和
+        # 头部是否像CSV，读4KB足够，不必把整个文件读进来
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                
-                if content.startswith('[') or content.startswith('{'):
-                    return 'json'
-                elif ',' in content and '\n' in content:
-                    return 'csv'
-                else:
-                    return 'txt'
+            with open(file_path, 'rb') as f:
+                head = f.read(4096).lstrip()
+
+            if head[:1] in (b'[', b'{'):
+                return 'json'
+            elif b',' in head and b'\n' in head:
+                return 'csv'
+            else:
+                return 'txt'
         except:
             return 'txt'
     
@@ -83,8 +261,8 @@ class WeChatChatImporter:
         """从JSON文件导入"""
         conversations = []
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = _read_json(f)
         
         # 处理不同类型的JSON格式
         if isinstance(data, list):
@@ -125,21 +303,20 @@ class WeChatChatImporter:
         """从文本文件导入"""
         conversations = []
         messages = []
-        
+
+        # 逐行流式解析：不把整个文件和整张行列表物化到内存。
+        # 热循环内把方法查找绑定为局部名，每行省掉两次属性分派
+        parse_line = self._parse_txt_line
+        append = messages.append
         with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 按行分割并解析
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            message = self._parse_txt_line(line)
-            if message:
-                messages.append(message)
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                message = parse_line(line)
+                if message:
+                    append(message)
         
         conversation = self._create_conversation_from_messages(messages)
         conversations.append(conversation)
@@ -148,67 +325,97 @@ class WeChatChatImporter:
     
     def _parse_txt_line(self, line: str) -> Optional[Dict]:
         """解析文本行"""
-        # 常见的微信格式匹配
-        
-        # 格式1: 2023-12-01 10:30:25 张三: 你好
-        pattern1 = r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+([^:]+):\s*(.+)'
-        match1 = re.match(pattern1, line)
-        if match1:
+        # 常见的微信格式匹配（单个融合模式，按命中的分组分派）
+        match = _LINE_RE.match(line)
+        if not match:
+            return None
+
+        if match.group('ts1') is not None:
+            # 格式1: 2023-12-01 10:30:25 张三: 你好
             return {
-                'timestamp': match1.group(1),
-                'sender': match1.group(2),
-                'content': match1.group(3),
+                'timestamp': match.group('ts1'),
+                'sender': match.group('s1'),
+                'content': match.group('c1'),
                 'type': 'text'
             }
-        
+
         # 格式2: 张三 10:30:25 你好
-        pattern2 = r'([^0-9]+)\s+(\d{2}:\d{2}:\d{2})\s+(.+)'
-        match2 = re.match(pattern2, line)
-        if match2:
-            return {
-                'timestamp': match2.group(2),
-                'sender': match2.group(1),
-                'content': match2.group(3),
-                'type': 'text'
-            }
-        
-        return None
+        return {
+            'timestamp': match.group('ts2'),
+            'sender': match.group('s2'),
+            'content': match.group('c2'),
+            'type': 'text'
+        }
     
     def _create_conversation_from_messages(self, messages: List[Dict]) -> Conversation:
         """从消息列表创建对话对象"""
-        turns = []
-        
-        for msg in messages:
-            # 提取发送者
-            sender = self._extract_sender(msg)
-            
-            # 提取内容
-            content = self._extract_content(msg)
-            
-            # 提取时间戳
-            timestamp = self._extract_timestamp(msg)
-            
-            # 提取消息类型
-            message_type = self._extract_message_type(msg)
-            
+        # 单遍提取：所有字段就地按优先级探测、命中即停，
+        # 省掉每条消息四次提取函数调用和重复的dict探测；
+        # 预分配槽位列表，避免append的摊还扩容
+        turns: List[Optional[Turn]] = [None] * len(messages)
+        # 参与者在主循环里就地去重收集，省掉事后对turns的第二遍遍历
+        participants = set()
+        # 每个唯一发送者的角色只判定一次，之后按dict命中
+        role_cache: Dict[str, SpeakerRole] = {}
+
+        for i, msg in enumerate(messages):
+            content = next((str(msg[f]).strip() for f in _CONTENT_FIELDS if f in msg), '')
+            # 内容为空、首字符不是中英文数字、或系统消息前缀时直接跳过
+            if not content:
+                continue
+            c = ord(content[0])
+            if not (0x30 <= c <= 0x39 or 0x41 <= c <= 0x5A or 0x61 <= c <= 0x7A
+                    or 0x4E00 <= c <= 0x9FFF) or content.startswith(_INVALID_PREFIXES):
+                continue
+
+            raw_type = next((str(msg[f]).lower() for f in _TYPE_FIELDS if f in msg), 'text')
             # 只处理文本消息
-            if message_type == 'text' and content.strip():
-                turn = Turn(
-                    content=content,
-                    speaker_role=SpeakerRole.USER if sender != '我' else SpeakerRole.ASSISTANT,
-                    timestamp=timestamp,
-                    metadata={
-                        'original_sender': sender,
-                        'message_type': message_type,
-                        'source': 'wechat'
-                    }
-                )
-                turns.append(turn)
-        
+            if _TYPE_ALIASES.get(raw_type, 'text') != 'text':
+                continue
+
+            sender = sys.intern(
+                next((str(msg[f]).strip() for f in _SENDER_FIELDS if f in msg), _UNKNOWN_SENDER)
+            )
+            participants.add(sender)
+            role = role_cache.get(sender)
+            if role is None:
+                role = SpeakerRole.ASSISTANT if sender is _ME else SpeakerRole.USER
+                role_cache[sender] = role
+
+            timestamp = None
+            for field in _TIME_FIELDS:
+                if field in msg:
+                    value = msg[field]
+                    if isinstance(value, str):
+                        timestamp = _parse_ts(value)
+                        if timestamp is not None:
+                            break
+                    elif isinstance(value, (int, float)):
+                        try:
+                            timestamp = datetime.fromtimestamp(value)
+                            break
+                        except Exception:
+                            continue
+            if timestamp is None:
+                timestamp = datetime.now()
+
+            turns[i] = Turn(
+                content=content,
+                speaker_role=role,
+                timestamp=timestamp,
+                metadata={
+                    _META_SENDER: sender,
+                    _META_TYPE: _TEXT,
+                    _META_SOURCE: _SRC_WECHAT
+                }
+            )
+
+        turns = [turn for turn in turns if turn is not None]
+
         # 创建对话
         conversation = Conversation(
             conversation_type=ConversationType.PERSONAL,
-            participants=[turn.metadata['original_sender'] for turn in turns],
+            participants=list(participants),
             turns=turns,
             metadata={
                 'source': 'wechat_import',
@@ -219,107 +426,13 @@ class WeChatChatImporter:
         
         return conversation
     
-    def _extract_sender(self, message: Dict) -> str:
-        """提取发送者"""
-        # 尝试不同的字段名
-        sender_fields = ['sender', 'from', 'from_user', 'user', 'name', 'nickname']
-        
-        for field in sender_fields:
-            if field in message:
-                return str(message[field]).strip()
-        
-        # 尝试从其他字段推断
-        if 'sender_name' in message:
-            return str(message['sender_name']).strip()
-        
-        return '未知用户'
-    
-    def _extract_content(self, message: Dict) -> str:
-        """提取消息内容"""
-        # 尝试不同的字段名
-        content_fields = ['content', 'text', 'msg', 'message', 'body']
-        
-        for field in content_fields:
-            if field in message:
-                content = str(message[field]).strip()
-                # 过滤掉系统消息和无效内容
-                if self._is_valid_content(content):
-                    return content
-        
-        return ''
-    
-    def _extract_timestamp(self, message: Dict) -> datetime:
-        """提取时间戳"""
-        # 尝试不同的字段名
-        time_fields = ['timestamp', 'time', 'date', 'created_at']
-        
-        for field in time_fields:
-            if field in message:
-                try:
-                    if isinstance(message[field], str):
-                        return datetime.fromisoformat(message[field].replace('Z', '+00:00'))
-                    elif isinstance(message[field], (int, float)):
-                        return datetime.fromtimestamp(message[field])
-                except:
-                    continue
-        
-        # 尝试解析字符串时间格式
-        if 'timestamp' in message:
-            try:
-                timestamp_str = str(message['timestamp'])
-                # 常见时间格式解析
-                formats = [
-                    '%Y-%m-%d %H:%M:%S',
-                    '%Y-%m-%d %H:%M',
-                    '%Y/%m/%d %H:%M:%S',
-                    '%Y/%m/%d %H:%M'
-                ]
-                
-                for fmt in formats:
-                    try:
-                        return datetime.strptime(timestamp_str, fmt)
-                    except:
-                        continue
-            except:
-                pass
-        
-        return datetime.now()
-    
-    def _extract_message_type(self, message: Dict) -> str:
-        """提取消息类型"""
-        type_fields = ['type', 'msg_type', 'message_type', 'category']
-        
-        for field in type_fields:
-            if field in message:
-                msg_type = str(message[field]).lower()
-                if msg_type in ['text', 'msg', 'message']:
-                    return 'text'
-                elif msg_type in ['image', 'img', 'pic']:
-                    return 'image'
-                elif msg_type in ['voice', 'audio']:
-                    return 'voice'
-                elif msg_type in ['video']:
-                    return 'video'
-                else:
-                    return 'text'  # 默认为文本
-        
-        return 'text'  # 默认为文本
-    
-    def _is_valid_content(self, content: str) -> bool:
-        """检查内容是否有效"""
-        # 过滤掉系统消息、空消息等
-        invalid_patterns = [
-            r'^(系统消息|system|通知|提示)',
-            r'^[^a-zA-Z0-9\u4e00-\u9fff]',  # 非中英文数字开头的消息
-            r'^\s*$',  # 纯空白字符
-        ]
-        
-        for pattern in invalid_patterns:
-            if re.match(pattern, content):
-                return False
-        
-        return len(content.strip()) > 0
-    
+    # 类属性别名保持原有的方法调用接口，实现在模块级函数里
+    _extract_sender = staticmethod(_extract_sender)
+    _extract_content = staticmethod(_extract_content)
+    _extract_timestamp = staticmethod(_extract_timestamp)
+    _extract_message_type = staticmethod(_extract_message_type)
+    _is_valid_content = staticmethod(_is_valid_content)
+
     def batch_import(self, directory: Union[str, Path]) -> List[Conversation]:
         """
         批量导入目录中的所有聊天记录文件
@@ -332,20 +445,33 @@ class WeChatChatImporter:
         """
         directory = Path(directory)
         conversations = []
-        
-        # 支持的微信聊天记录文件扩展名
-        wechat_extensions = ['*.txt', '*.json', '*.csv', '*.log']
-        
-        for pattern in wechat_extensions:
-            for file_path in directory.glob(pattern):
+
+        # 单次目录扫描按后缀过滤（原来四个glob各扫一遍目录）
+        wechat_suffixes = {'.txt', '.json', '.csv', '.log'}
+        file_paths = sorted(
+            p for p in directory.iterdir()
+            if p.is_file() and p.suffix.lower() in wechat_suffixes
+        )
+        if not file_paths:
+            return conversations
+
+        # 文件之间相互独立，解析以正则和dict构造为主是CPU密集型，
+        # 按核数并行到子进程，随核数近线性扩展
+        max_workers = min(len(file_paths), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.import_from_file, file_path): file_path
+                for file_path in file_paths
+            }
+            for future in concurrent.futures.as_completed(futures):
+                file_path = futures[future]
                 try:
-                    print(f"正在导入: {file_path.name}")
-                    imported_conversations = self.import_from_file(file_path)
+                    imported_conversations = future.result()
                     conversations.extend(imported_conversations)
-                    print(f"成功导入 {len(imported_conversations)} 个对话")
+                    print(f"成功导入 {file_path.name}: {len(imported_conversations)} 个对话")
                 except Exception as e:
                     print(f"导入文件 {file_path} 失败: {e}")
-        
+
         return conversations
     
     def export_to_standard_format(self, conversations: List[Conversation], output_path: Union[str, Path]):
@@ -372,8 +498,12 @@ class WeChatChatImporter:
                     })
         
         # 导出为JSON格式
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(standard_data, f, ensure_ascii=False, indent=2)
+        if _HAS_ORJSON:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(standard_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(standard_data, f, ensure_ascii=False, indent=2)
         
         print(f"标准格式导出完成: {output_path}")
 
@@ -12,8 +12,47 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 import redis.asyncio as redis
+import asyncpg
 import json
 
+# 兼容性处理 msgpack（datetime/浮点编解码比json快数倍）；缺失时退回pickle协议5
+try:
+    import msgpack
+
+    def _cache_dumps(data: Any) -> bytes:
+        return msgpack.packb(data, default=str, use_bin_type=True)
+
+    def _cache_loads(raw: bytes) -> Any:
+        return msgpack.unpackb(raw, raw=False)
+except ImportError:
+    import pickle
+
+    def _cache_dumps(data: Any) -> bytes:
+        return pickle.dumps(data, protocol=5)
+
+    def _cache_loads(raw: bytes) -> Any:
+        return pickle.loads(raw)
+
+
+# Redis键前缀（bytes常量加编码后的id拼接，省掉每次调用的f-string格式化
+# 和redis-py内部的一次编码；redis-py直接接受bytes键）
+_K_CONV = b"conversation:"
+_K_ANALYSIS = b"analysis:"
+_K_PULSE = b"pulse_points:"
+
+
+# 热路径SQL做成模块常量：asyncpg按语句文本在每个连接上缓存服务端
+# 预编译计划，文本稳定即可命中缓存，免去逐次re-parse/re-plan
+_SQL_GET_TURNS = (
+    "SELECT id, conversation_id, speaker_role, content, timestamp, "
+    "features, meta_data "
+    "FROM turns WHERE conversation_id = $1 ORDER BY timestamp"
+)
+_SQL_UPDATE_ANALYSIS = (
+    "UPDATE conversations SET analysis_summary = $2, pulse_score = $3, "
+    "patterns = $4, updated_at = $5 WHERE id = $1"
+)
+
 
 # 数据库模型
 Base = declarative_base()
@@ -90,16 +129,30 @@ class PostgreSQLProvider(DatabaseProvider):
     
     def __init__(self, database_url: str):
         self.database_url = database_url
+        # 显式连接池配置：默认pool_size=5在并发请求下排队或无上限溢出；
+        # pre_ping剔除失效连接，recycle避免被服务端/中间件掐掉长连接
         self.async_engine = create_async_engine(
             database_url.replace("postgresql://", "postgresql+asyncpg://"),
+            pool_size=20,
+            max_overflow=10,
+            pool_pre_ping=True,
+            pool_recycle=1800,
             echo=False
         )
         self.async_session = async_sessionmaker(
-            self.async_engine, 
-            class_=AsyncSession, 
+            self.async_engine,
+            class_=AsyncSession,
             expire_on_commit=False
         )
-    
+        # asyncpg连接池：热路径查询绕过ORM直接取行（惰性创建）
+        self._pool: Optional[asyncpg.Pool] = None
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        """获取asyncpg连接池（首次调用时创建）"""
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(self.database_url)
+        return self._pool
+
     async def init_db(self):
         """初始化数据库"""
         async with self.async_engine.begin() as conn:
@@ -148,52 +201,78 @@ class PostgreSQLProvider(DatabaseProvider):
                 return True
         except SQLAlchemyError:
             return False
-    
+
+    async def save_turns(self, turns: List[Dict[str, Any]]) -> bool:
+        """批量保存对话轮次
+
+        导入场景下逐条save_turn意味着每条消息一次往返、一次commit。
+        这里走asyncpg的COPY协议，一个事务一次提交写入整批。
+        """
+        if not turns:
+            return True
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.copy_records_to_table(
+                        'turns',
+                        records=[
+                            (
+                                turn['id'],
+                                turn['conversation_id'],
+                                turn['speaker_role'],
+                                turn['content'],
+                                turn['timestamp'],
+                                json.dumps(turn.get('features')),
+                                json.dumps(turn.get('meta_data'))
+                            )
+                            for turn in turns
+                        ],
+                        columns=[
+                            'id', 'conversation_id', 'speaker_role',
+                            'content', 'timestamp', 'features', 'meta_data'
+                        ]
+                    )
+            return True
+        except Exception:
+            return False
+
     async def get_conversation_turns(self, conversation_id: str) -> List[Dict[str, Any]]:
         """获取对话的所有轮次"""
+        # 读取热路径绕过ORM：asyncpg的Record直接转dict，
+        # 省掉行对象构造和逐属性访问的二次拷贝
         try:
-            async with self.async_session() as session:
-                result = await session.execute(
-                    "SELECT * FROM turns WHERE conversation_id = :cid ORDER BY timestamp",
-                    {"cid": conversation_id}
-                )
-                turns = result.fetchall()
-                return [
-                    {
-                        "id": turn.id,
-                        "conversation_id": turn.conversation_id,
-                        "speaker_role": turn.speaker_role,
-                        "content": turn.content,
-                        "timestamp": turn.timestamp,
-                        "features": turn.features,
-                        "metadata": turn.metadata
-                    }
-                    for turn in turns
-                ]
-        except SQLAlchemyError:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(_SQL_GET_TURNS, conversation_id)
+                return [dict(row) for row in rows]
+        except Exception:
             return []
     
     async def update_conversation_analysis(self, conversation_id: str, analysis_data: Dict[str, Any]) -> bool:
         """更新对话分析结果"""
+        # 与get_conversation_turns一致走asyncpg：语句文本稳定，
+        # 服务端计划在连接上复用；原实现把裸SQL字符串交给session.execute，
+        # 在SQLAlchemy 2.x下缺少text()包装会直接报错
         try:
-            async with self.async_session() as session:
-                await session.execute(
-                    "UPDATE conversations SET analysis_summary = :summary, pulse_score = :score, patterns = :patterns, updated_at = :updated WHERE id = :id",
-                    {
-                        "id": conversation_id,
-                        "summary": analysis_data.get("analysis_summary"),
-                        "score": analysis_data.get("pulse_score"),
-                        "patterns": analysis_data.get("patterns"),
-                        "updated": datetime.utcnow()
-                    }
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    _SQL_UPDATE_ANALYSIS,
+                    conversation_id,
+                    analysis_data.get("analysis_summary"),
+                    analysis_data.get("pulse_score"),
+                    json.dumps(analysis_data.get("patterns")),
+                    datetime.utcnow()
                 )
-                await session.commit()
-                return True
-        except SQLAlchemyError:
+            return True
+        except Exception:
             return False
     
     async def close(self):
         """关闭数据库连接"""
+        if self._pool is not None:
+            await self._pool.close()
         await self.async_engine.dispose()
 
 
@@ -206,17 +285,19 @@ class RedisCacheProvider:
     
     async def connect(self):
         """连接Redis"""
-        self.redis_client = redis.from_url(self.redis_url)
+        # 显式关闭响应解码：值是msgpack/pickle二进制载荷，键是bytes常量，
+        # 解码成str既多一次拷贝也会破坏二进制数据
+        self.redis_client = redis.from_url(self.redis_url, decode_responses=False)
     
     async def cache_conversation(self, conversation_id: str, conversation_data: Dict[str, Any], expire_seconds: int = 3600):
         """缓存对话数据"""
         try:
             if self.redis_client:
-                key = f"conversation:{conversation_id}"
+                key = _K_CONV + conversation_id.encode()
                 await self.redis_client.setex(
                     key, 
                     expire_seconds, 
-                    json.dumps(conversation_data, default=str)
+                    _cache_dumps(conversation_data)
                 )
         except Exception:
             pass  # 缓存失败不影响主功能
@@ -225,23 +306,61 @@ class RedisCacheProvider:
         """获取缓存的对话数据"""
         try:
             if self.redis_client:
-                key = f"conversation:{conversation_id}"
+                key = _K_CONV + conversation_id.encode()
                 data = await self.redis_client.get(key)
                 if data:
-                    return json.loads(data)
+                    return _cache_loads(data)
         except Exception:
             pass
         return None
     
+    async def get_cached_many(self, conversation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取缓存的对话数据（MGET一次往返）"""
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            if self.redis_client and conversation_ids:
+                keys = [_K_CONV + cid.encode() for cid in conversation_ids]
+                values = await self.redis_client.mget(keys)
+                for conversation_id, data in zip(conversation_ids, values):
+                    if data:
+                        results[conversation_id] = _cache_loads(data)
+        except Exception:
+            pass
+        return results
+
+    async def get_cached_bundle(self, conversation_id: str) -> Dict[str, Any]:
+        """一次往返取回单个对话的全部缓存条目（对话、分析、脉冲点）"""
+        bundle: Dict[str, Any] = {
+            "conversation": None,
+            "analysis": None,
+            "pulse_points": None
+        }
+        try:
+            if self.redis_client:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(_K_CONV + conversation_id.encode())
+                    pipe.get(_K_ANALYSIS + conversation_id.encode())
+                    pipe.get(_K_PULSE + conversation_id.encode())
+                    conv_raw, analysis_raw, points_raw = await pipe.execute()
+                if conv_raw:
+                    bundle["conversation"] = _cache_loads(conv_raw)
+                if analysis_raw:
+                    bundle["analysis"] = _cache_loads(analysis_raw)
+                if points_raw:
+                    bundle["pulse_points"] = _cache_loads(points_raw)
+        except Exception:
+            pass
+        return bundle
+
     async def cache_analysis_result(self, conversation_id: str, analysis_data: Dict[str, Any], expire_seconds: int = 1800):
         """缓存分析结果"""
         try:
             if self.redis_client:
-                key = f"analysis:{conversation_id}"
+                key = _K_ANALYSIS + conversation_id.encode()
                 await self.redis_client.setex(
                     key,
                     expire_seconds,
-                    json.dumps(analysis_data, default=str)
+                    _cache_dumps(analysis_data)
                 )
         except Exception:
             pass
@@ -250,23 +369,52 @@ class RedisCacheProvider:
         """获取缓存的分析结果"""
         try:
             if self.redis_client:
-                key = f"analysis:{conversation_id}"
+                key = _K_ANALYSIS + conversation_id.encode()
                 data = await self.redis_client.get(key)
                 if data:
-                    return json.loads(data)
+                    return _cache_loads(data)
         except Exception:
             pass
         return None
     
+    async def cache_analyses(self, analyses: Dict[str, Dict[str, Any]], expire_seconds: int = 1800):
+        """批量缓存分析结果（pipeline一次往返写入全部条目）"""
+        try:
+            if self.redis_client and analyses:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for conversation_id, analysis_data in analyses.items():
+                        pipe.setex(
+                            _K_ANALYSIS + conversation_id.encode(),
+                            expire_seconds,
+                            _cache_dumps(analysis_data)
+                        )
+                    await pipe.execute()
+        except Exception:
+            pass
+
+    async def get_cached_analyses(self, conversation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取缓存的分析结果（MGET一次往返）"""
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            if self.redis_client and conversation_ids:
+                keys = [_K_ANALYSIS + cid.encode() for cid in conversation_ids]
+                values = await self.redis_client.mget(keys)
+                for conversation_id, data in zip(conversation_ids, values):
+                    if data:
+                        results[conversation_id] = _cache_loads(data)
+        except Exception:
+            pass
+        return results
+
     async def cache_pulse_points(self, conversation_id: str, pulse_points: List[Dict[str, Any]], expire_seconds: int = 1800):
         """缓存脉冲点数据"""
         try:
             if self.redis_client:
-                key = f"pulse_points:{conversation_id}"
+                key = _K_PULSE + conversation_id.encode()
                 await self.redis_client.setex(
                     key,
                     expire_seconds,
-                    json.dumps(pulse_points, default=str)
+                    _cache_dumps(pulse_points)
                 )
         except Exception:
             pass
@@ -275,10 +423,10 @@ class RedisCacheProvider:
         """获取缓存的脉冲点数据"""
         try:
             if self.redis_client:
-                key = f"pulse_points:{conversation_id}"
+                key = _K_PULSE + conversation_id.encode()
                 data = await self.redis_client.get(key)
                 if data:
-                    return json.loads(data)
+                    return _cache_loads(data)
         except Exception:
             pass
         return None
@@ -317,7 +465,14 @@ class MockDatabaseProvider(DatabaseProvider):
             return True
         except Exception:
             return False
-    
+
+    async def save_turns(self, turns: List[Dict[str, Any]]) -> bool:
+        """批量保存对话轮次"""
+        for turn in turns:
+            if not await self.save_turn(turn):
+                return False
+        return True
+
     async def get_conversation_turns(self, conversation_id: str) -> List[Dict[str, Any]]:
         """获取对话的所有轮次"""
         return self.turns.get(conversation_id, [])
@@ -5,17 +5,134 @@
 import os
 import json
 import time
+import random
 import asyncio
 import hashlib
 import hmac
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, AsyncIterator
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
 import httpx
 from loguru import logger
 
+# 兼容性处理 orjson（原生实现的JSON编解码，比标准库快数倍）；缺失时退回标准库json
+try:
+    import orjson
+
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    def _json_loads(raw: bytes) -> Any:
+        return orjson.loads(raw)
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode()
+
+    def _json_loads(raw: bytes) -> Any:
+        return json.loads(raw)
+
 from config import get_settings, get_llm_settings
 from infrastructure.llm_providers.providers import LLMProvider
 
+# 洞察/建议行首尾要剥掉的序号和标点（模块级常量，每行调用免于重建字符集；
+# 必须保留strip的仅修剪两端语义，translate删除表会误删正文内部的数字）
+_LIST_STRIP_CHARS = '123456789.-、。· '
+
+
+def _extract_choices(response_data: Dict[str, Any]) -> str:
+    """OpenAI兼容格式：choices[0].message，content为空时取reasoning_content"""
+    message = response_data["choices"][0].get("message", {})
+    return message.get("content") or message.get("reasoning_content", "")
+
+
+def _extract_data(response_data: Dict[str, Any]) -> str:
+    """data字段格式：兼容dict与list两种形态"""
+    data = response_data["data"]
+    if isinstance(data, dict):
+        return data.get("content", "")
+    if isinstance(data, list) and data:
+        return data[0].get("content", "")
+    return ""
+
+
+# 响应内容提取器表（按优先级排列）：新的响应格式只需在这里加一项，
+# 不用再往chat_completion的解析代码里叠if分支
+_CONTENT_EXTRACTORS = (
+    ("choices", _extract_choices),
+    ("result", lambda r: r["result"]),
+    ("data", _extract_data),
+)
+
+
+class AsyncTokenBucket:
+    """异步令牌桶限流器
+
+    以恒定速率补充令牌，允许burst大小的突发；令牌不足时主动等待，
+    把撞上429再重试的浪费往返换成客户端侧的排队。
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取走一个令牌，不足时等待补充（允许欠账以保证并发下的公平排队）"""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0.0 else -self._tokens / self.rate
+        if wait > 0.0:
+            await asyncio.sleep(wait)
+
+
+# 进程内共享的限流器：所有提供商实例走同一个桶，出站速率上限才有意义
+_rate_limiter: Optional[AsyncTokenBucket] = None
+
+
+def _get_rate_limiter() -> AsyncTokenBucket:
+    """获取共享的令牌桶限流器（按配置懒初始化）"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        llm_settings = get_llm_settings()
+        _rate_limiter = AsyncTokenBucket(
+            rate=llm_settings.paddle_requests_per_second,
+            burst=llm_settings.paddle_rate_burst
+        )
+    return _rate_limiter
+
+
+def _body_snippet(response: httpx.Response, limit: int = 2048) -> str:
+    """截取响应体前limit字节用于日志和错误信息
+
+    response.text要按字符集探测解码完整响应体；日志和错误提示
+    只需要开头一段，按字节截断后再解码，代价与响应大小无关。
+    """
+    return response.content[:limit].decode('utf-8', 'replace')
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """解析Retry-After响应头（整数秒或HTTP日期），无法解析时返回None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+
 
 class PaddleLLMProvider(LLMProvider):
     """飞桨平台LLM提供商"""
@@ -33,10 +150,38 @@ class PaddleLLMProvider(LLMProvider):
         self.temperature = self.llm_settings.paddle_temperature
         self.max_tokens = self.llm_settings.paddle_max_tokens
         self.access_token = self.settings.paddle_access_token
-        
-        # 初始化HTTP客户端
-        self.client = httpx.AsyncClient(timeout=60.0)
-        
+
+        # 请求头的静态部分只构建一次，重试循环里仅补时间戳字段
+        self._base_headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"Bearer {self.access_token}"
+        }
+
+        # 初始化HTTP客户端：显式配置连接池上限，默认limits在高并发下
+        # 封顶吞吐。注意客户端必须在运行中的事件循环内创建，
+        # 跨事件循环复用连接池会出错
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=self.llm_settings.paddle_max_connections,
+                max_keepalive_connections=self.llm_settings.paddle_max_keepalive,
+                keepalive_expiry=30.0
+            )
+        )
+        
+        # 确定性调用（temperature=0）的响应缓存：相同输入直接复用结果，
+        # 省掉整次HTTP往返和token消耗（带TTL的LRU，锁保护并发访问）
+        self._response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = asyncio.Lock()
+        self._cache_max_entries = 256
+        self._cache_ttl = 3600.0
+        self.stats = {"cache_hits": 0, "cache_misses": 0}
+
+        # 打包分析的任务表（按文本哈希）：同一文本的情感/关键词/复杂度
+        # 三个公共API共享同一次上游调用，并发调用也只发一个请求
+        self._bundle_tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
         # 检查访问令牌
         if not self.access_token:
             logger.warning("未设置飞桨平台访问令牌，请使用set_access_token方法设置")
@@ -54,6 +199,11 @@ class PaddleLLMProvider(LLMProvider):
     def set_access_token(self, token: str):
         """设置访问令牌"""
         self.access_token = token
+        self._base_headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
         logger.info("已更新飞桨平台访问令牌")
     
     async def chat_completion(
@@ -64,11 +214,12 @@ class PaddleLLMProvider(LLMProvider):
         max_tokens: Optional[int] = None,
         retry_count: int = 3,
         retry_delay: float = 1.0,
+        include_raw: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
         """
         与飞桨平台进行对话生成
-        
+
         Args:
             messages: 对话历史消息列表
             model: 模型名称，默认为配置中的模型
@@ -76,14 +227,16 @@ class PaddleLLMProvider(LLMProvider):
             max_tokens: 最大生成长度，默认为配置中的最大token数
             retry_count: 重试次数，默认为3次
             retry_delay: 重试延迟，默认为1秒
+            include_raw: 是否在返回值里附带原始响应（仅调试需要）
             **kwargs: 其他参数
             
         Returns:
             包含生成结果的字典
         """
-        # 设置默认值
+        # 设置默认值（按None判断：temperature=0.0是合法的确定性取值，
+        # 用or会把它错误地替换成配置默认值）
         model = model or self.model_name
-        temperature = temperature or self.temperature
+        temperature = self.temperature if temperature is None else temperature
         max_tokens = max_tokens or self.max_tokens
         
         # 检查访问令牌
@@ -95,47 +248,75 @@ class PaddleLLMProvider(LLMProvider):
                 "response": None
             }
         
+        # 确定性调用走内容寻址缓存；非零温度、带额外参数或要原始响应的
+        # 调用不缓存（缓存里只存精简形态的结果）
+        cache_key = None
+        if temperature == 0 and not kwargs and not include_raw:
+            cache_key = hashlib.sha256(json.dumps(
+                {
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens
+                },
+                sort_keys=True,
+                ensure_ascii=False
+            ).encode()).hexdigest()
+            async with self._cache_lock:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    cached_at, cached_response = cached
+                    if time.time() - cached_at < self._cache_ttl:
+                        self._response_cache.move_to_end(cache_key)
+                        self.stats["cache_hits"] += 1
+                        logger.info("命中确定性响应缓存，跳过飞桨平台API调用")
+                        return cached_response
+                    del self._response_cache[cache_key]
+                self.stats["cache_misses"] += 1
+
         # 构建请求URL - 百度AI Studio API路径
         request_url = f"{self.base_url}/chat/completions"
         
         # 准备请求数据 - 百度AI Studio格式
+        # 一个字面量在C层一次构建完成；显式键放在**kwargs之后，
+        # 保持"调用方参数不能覆盖核心字段"的原语义
         request_data = {
+            "stream": False,
+            **kwargs,
             "model": model,
             "messages": messages,
             "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": False
+            "max_tokens": max_tokens
         }
-        
-        # 添加其他参数
-        if kwargs:
-            for key, value in kwargs.items():
-                if key not in request_data:
-                    request_data[key] = value
-        
+
+
+        # 请求体跨重试不变，只序列化一次
+        request_body = _json_dumps(request_data)
+
         # 重试机制
         for attempt in range(retry_count):
-            # 准备请求头
-            current_datetime = datetime.utcnow()
-            iso_date = current_datetime.strftime("%Y-%m-%dT%H:%M:%SZ")
-            
+            # 每次尝试只重算两个时间戳字段；RFC 1123日期走C实现的
+            # format_datetime，比strftime快；utcnow已弃用，改用带时区的now
+            now = datetime.now(timezone.utc)
             headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "Authorization": f"Bearer {self.access_token}",
-                "X-BCE-Date": iso_date,
-                "Date": current_datetime.strftime("%a, %d %b %Y %H:%M:%S GMT")
+                **self._base_headers,
+                "X-BCE-Date": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "Date": format_datetime(now, usegmt=True)
             }
-            
+
             try:
+                # 客户端侧限流：令牌不足时在这里排队，而不是发出去撞429
+                await _get_rate_limiter().acquire()
+
                 # 发送请求
                 logger.info(f"向飞桨平台发送请求，模型: {model} (尝试 {attempt + 1}/{retry_count})")
                 start_time = time.time()
                 
+                # 请求体自行序列化（Content-Type已在基础请求头里）
                 response = await self.client.post(
                     request_url,
                     headers=headers,
-                    json=request_data,
+                    content=request_body,
                     timeout=120.0
                 )
                 
@@ -143,17 +324,19 @@ class PaddleLLMProvider(LLMProvider):
                 elapsed_time = time.time() - start_time
                 logger.info(f"飞桨平台响应时间: {elapsed_time:.2f}秒")
                 logger.debug(f"响应状态: {response.status_code}")
-                logger.debug(f"响应内容: {response.text}")
-                
-                # 解析响应
+                # 惰性求值：DEBUG级别关闭时连解码都不发生
+                logger.opt(lazy=True).debug("响应内容: {body}", body=lambda: _body_snippet(response))
+
+                # 解析响应（直接解析原始bytes，跳过response.json()的二次分派）
                 try:
-                    response_data = response.json()
-                except json.JSONDecodeError:
-                    logger.error(f"响应解析失败: {response.text}")
+                    response_data = _json_loads(response.content)
+                except ValueError:
+                    snippet = _body_snippet(response)
+                    logger.error(f"响应解析失败: {snippet}")
                     return {
                         "success": False,
-                        "error": f"响应解析失败: {response.text[:100]}...",
-                        "response": response.text
+                        "error": f"响应解析失败: {snippet[:100]}...",
+                        "response": snippet
                     }
                 
                 # 检查API响应状态 - 百度AI Studio格式
@@ -161,10 +344,14 @@ class PaddleLLMProvider(LLMProvider):
                     error_msg = response_data.get("errorMsg", "未知错误")
                     error_code = response_data.get("errorCode", "未知错误码")
                     
-                    # 如果是频率限制错误，重试
+                    # 如果是频率限制错误，重试：优先听服务端Retry-After的，
+                    # 没有再用带抖动的指数退避（抖动错开并发客户端的重试风暴）
                     if "访问过于频繁" in error_msg and attempt < retry_count - 1:
-                        logger.warning(f"API调用过于频繁，{retry_delay}秒后重试...")
-                        await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
+                        delay = _retry_after_seconds(response)
+                        if delay is None:
+                            delay = retry_delay * (2 ** attempt) * (1 + random.random())
+                        logger.warning(f"API调用过于频繁，{delay:.1f}秒后重试...")
+                        await asyncio.sleep(delay)
                         continue
                     
                     logger.error(f"飞桨平台API返回错误: 错误码 {error_code}, 错误信息: {error_msg}")
@@ -176,10 +363,13 @@ class PaddleLLMProvider(LLMProvider):
                 
                 # 检查HTTP状态
                 if response.status_code != 200:
-                    # 如果是403或429错误，重试
+                    # 如果是403或429错误，重试：同样优先尊重Retry-After
                     if response.status_code in [403, 429] and attempt < retry_count - 1:
-                        logger.warning(f"请求被拒绝 (状态码: {response.status_code})，{retry_delay}秒后重试...")
-                        await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
+                        delay = _retry_after_seconds(response)
+                        if delay is None:
+                            delay = retry_delay * (2 ** attempt) * (1 + random.random())
+                        logger.warning(f"请求被拒绝 (状态码: {response.status_code})，{delay:.1f}秒后重试...")
+                        await asyncio.sleep(delay)
                         continue
                     
                     logger.error(f"飞桨平台API调用失败，状态码: {response.status_code}")
@@ -189,54 +379,53 @@ class PaddleLLMProvider(LLMProvider):
                         "response": response_data
                     }
                 
-                # 提取结果内容 - 兼容多种响应格式
+                # 提取结果内容 - 按优先级走提取器表，兼容多种响应格式
                 content = ""
-                
-                # 格式1: OpenAI兼容格式
-                if "choices" in response_data:
-                    choice = response_data["choices"][0]
-                    message = choice.get("message", {})
-                    # 优先获取content，若为空则使用reasoning_content
-                    content = message.get("content", "")
-                    if not content:
-                        content = message.get("reasoning_content", "")
-                        logger.info(f"使用reasoning_content作为响应内容")
-                # 格式2: 百度ERNIE API格式
-                elif "result" in response_data:
-                    content = response_data["result"]
-                # 格式3: 其他可能的格式
-                elif "data" in response_data:
-                    if isinstance(response_data["data"], dict):
-                        content = response_data["data"].get("content", "")
-                    elif isinstance(response_data["data"], list):
-                        content = response_data["data"][0].get("content", "") if response_data["data"] else ""
-                
+                for key, extract in _CONTENT_EXTRACTORS:
+                    if key in response_data:
+                        content = extract(response_data)
+                        if content:
+                            break
+
+
                 # 如果内容仍然为空，尝试从其他字段提取
                 if not content:
                     content = str(response_data)
                     logger.warning(f"无法从标准字段提取内容，使用原始响应: {content[:100]}...")
                 
-                # 构建标准化的响应格式
+                # 构建标准化的响应格式。原始响应默认不附带：长补全的
+                # raw dict会把内容连同大段token元数据再复制一份，
+                # 而分析调用方读完text就全部丢弃
                 normalized_response = {
                     "success": True,
                     "text": content,
                     "model": model,
-                    "usage": {
-                        "prompt_tokens": response_data.get("usage", {}).get("prompt_tokens", 0),
-                        "completion_tokens": response_data.get("usage", {}).get("completion_tokens", 0),
-                        "total_tokens": response_data.get("usage", {}).get("total_tokens", 0)
+                    "usage": response_data.get("usage") or {
+                        "prompt_tokens": 0,
+                        "completion_tokens": 0,
+                        "total_tokens": 0
                     },
-                    "created_at": datetime.now().isoformat(),
-                    "raw_response": response_data
+                    "created_at": datetime.now().isoformat()
                 }
+                if include_raw:
+                    normalized_response["raw_response"] = response_data
                 
+                # 成功的确定性响应写入缓存，超出容量时淘汰最久未用的条目
+                if cache_key is not None:
+                    async with self._cache_lock:
+                        self._response_cache[cache_key] = (time.time(), normalized_response)
+                        self._response_cache.move_to_end(cache_key)
+                        while len(self._response_cache) > self._cache_max_entries:
+                            self._response_cache.popitem(last=False)
+
                 logger.info(f"成功从飞桨平台获取响应，内容长度: {len(content)}")
                 return normalized_response
                 
             except httpx.TimeoutException:
                 if attempt < retry_count - 1:
-                    logger.warning(f"请求超时，{retry_delay}秒后重试...")
-                    await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
+                    delay = retry_delay * (2 ** attempt) * (1 + random.random())  # 带抖动的指数退避
+                    logger.warning(f"请求超时，{delay:.1f}秒后重试...")
+                    await asyncio.sleep(delay)
                     continue
                 logger.error("飞桨平台API请求超时")
                 return {
@@ -247,8 +436,9 @@ class PaddleLLMProvider(LLMProvider):
             
             except httpx.RequestError as e:
                 if attempt < retry_count - 1:
-                    logger.warning(f"请求错误，{retry_delay}秒后重试...")
-                    await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
+                    delay = retry_delay * (2 ** attempt) * (1 + random.random())  # 带抖动的指数退避
+                    logger.warning(f"请求错误，{delay:.1f}秒后重试...")
+                    await asyncio.sleep(delay)
                     continue
                 logger.error(f"飞桨平台API请求错误: {str(e)}")
                 return {
@@ -259,8 +449,9 @@ class PaddleLLMProvider(LLMProvider):
             
             except Exception as e:
                 if attempt < retry_count - 1:
-                    logger.warning(f"未知错误，{retry_delay}秒后重试...")
-                    await asyncio.sleep(retry_delay * (2 ** attempt))  # 指数退避
+                    delay = retry_delay * (2 ** attempt) * (1 + random.random())  # 带抖动的指数退避
+                    logger.warning(f"未知错误，{delay:.1f}秒后重试...")
+                    await asyncio.sleep(delay)
                     continue
                 logger.error(f"飞桨平台API调用未知错误: {str(e)}")
                 return {
@@ -277,6 +468,78 @@ class PaddleLLMProvider(LLMProvider):
             "response": None
         }
     
+    async def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """流式对话生成，按增量文本逐段产出
+
+        非流式调用要等整段生成完才拿到第一字节；这里走SSE流，
+        首个token一到就交给调用方，长生成的感知延迟大约减半，
+        下游的后处理也能与生成重叠进行。
+        """
+        model = model or self.model_name
+        temperature = self.temperature if temperature is None else temperature
+        max_tokens = max_tokens or self.max_tokens
+
+        if not self.access_token:
+            logger.error("访问令牌未设置，无法调用飞桨平台API")
+            return
+
+        request_url = f"{self.base_url}/chat/completions"
+        request_data = {
+            **kwargs,
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+
+        await _get_rate_limiter().acquire()
+        now = datetime.now(timezone.utc)
+        headers = {
+            **self._base_headers,
+            "X-BCE-Date": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "Date": format_datetime(now, usegmt=True)
+        }
+
+        logger.info(f"向飞桨平台发送流式请求，模型: {model}")
+        async with self.client.stream(
+            "POST",
+            request_url,
+            headers=headers,
+            content=_json_dumps(request_data),
+            timeout=120.0
+        ) as response:
+            if response.status_code != 200:
+                # 非200的错误体没有data行，静默迭代会产出空流，调用方
+                # 误以为生成了空内容；抛错让_generate_list退回非流式路径
+                logger.error(f"飞桨平台流式API错误，状态码: {response.status_code}")
+                raise Exception(f"飞桨平台流式API错误，状态码: {response.status_code}")
+            async for line in response.aiter_lines():
+                # SSE格式：每个数据块一行"data: {...}"，[DONE]表示结束
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if not payload or payload == "[DONE]":
+                    continue
+                try:
+                    chunk = json.loads(payload)
+                except ValueError:
+                    continue
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                delta = choices[0].get("delta", {})
+                piece = delta.get("content") or delta.get("reasoning_content") or ""
+                if piece:
+                    yield piece
+
     async def get_model_info(self) -> Dict[str, Any]:
         """获取模型信息"""
         if not self.access_token:
@@ -348,88 +611,139 @@ class PaddleLLMProvider(LLMProvider):
         """关闭客户端"""
         await self.client.aclose()
 
-    # 实现LLMProvider抽象方法
-    async def analyze_sentiment(self, text: str) -> float:
-        """分析文本情感"""
+    async def analyze_bundle(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+        """一次调用同时取得情感、关键词与复杂度
+
+        三项基础分析分开调用要付三次HTTP往返，文本在提示词里重复
+        发送三遍；这里用一个要求返回JSON的提示词，一次确定性调用
+        拿到全部三项。同一文本的并发调用按文本哈希共享同一个
+        进行中的请求。
+        """
+        key = hashlib.sha256(text.encode()).hexdigest()
+        task = self._bundle_tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_bundle(text))
+            self._bundle_tasks[key] = task
+            while len(self._bundle_tasks) > self._cache_max_entries:
+                self._bundle_tasks.popitem(last=False)
+        else:
+            self._bundle_tasks.move_to_end(key)
+        try:
+            bundle = await task
+        except Exception as e:
+            # 失败的任务不能留在缓存里：缓存无TTL，一次瞬时超时会把
+            # 这段文本钉在中性/空分析上直到进程结束。剔除后降级为
+            # 默认值，下次调用重新发起请求
+            if self._bundle_tasks.get(key) is task:
+                del self._bundle_tasks[key]
+            logger.error(f"打包分析失败，本次降级为默认值: {e}")
+            return {"sentiment": 0.0, "keywords": [], "complexity": 0.5}
+        if len(bundle["keywords"]) > max_keywords:
+            # 共享的结果不能原地截断，复制一份收窄keywords
+            return {**bundle, "keywords": bundle["keywords"][:max_keywords]}
+        return bundle
+
+    async def _fetch_bundle(self, text: str) -> Dict[str, Any]:
+        """发起打包分析请求并解析JSON结果（上游调用失败时抛错）"""
         prompt = f"""
-        分析以下文本的情感倾向，返回-1到1之间的数值：
-        -1表示强烈负面，0表示中性，1表示强烈正面
+        对以下文本同时完成三项分析，只返回一个JSON对象，不要返回其他内容：
+        {{"sentiment": -1到1之间的情感分数, "keywords": 最多10个关键词的数组, "complexity": 0到1之间的复杂度}}
+        情感：-1表示强烈负面，0表示中性，1表示强烈正面
+        复杂度：考虑句式复杂度、词汇难度、逻辑结构等，0最简单，1最复杂
         文本：{text}
-        只返回数字，不要返回其他内容。
         """
-        
+
         messages = [{"role": "user", "content": prompt}]
-        response = await self.chat_completion(messages, temperature=0.0, max_tokens=10)
-        
-        if response.get("success") and "text" in response:
+        response = await self.chat_completion(messages, temperature=0.0, max_tokens=300)
+
+        if not response.get("success") or "text" not in response:
+            # 抛给analyze_bundle处理：失败结果不能作为任务留在缓存里
+            raise Exception(f"打包分析请求失败: {response.get('error', '未知错误')}")
+
+        bundle = {"sentiment": 0.0, "keywords": [], "complexity": 0.5}
+        content = response["text"]
+        data = {}
+        # 截取首尾大括号之间的部分，容忍JSON前后的多余文字
+        start = content.find('{')
+        end = content.rfind('}')
+        if start != -1 and end > start:
             try:
-                # 提取数字
-                import re
-                numbers = re.findall(r'[-+]?\d*\.?\d+', response["text"])
-                if numbers:
-                    sentiment_score = float(numbers[0])
-                    # 确保分数在[-1, 1]范围内
-                    return max(-1.0, min(1.0, sentiment_score))
-            except Exception as e:
-                logger.error(f"情感分析结果解析失败: {e}")
-        
-        return 0.0
+                data = json.loads(content[start:end + 1])
+            except (ValueError, TypeError):
+                logger.error(f"打包分析结果解析失败: {content[:100]}...")
+        try:
+            bundle["sentiment"] = max(-1.0, min(1.0, float(data.get("sentiment", 0.0))))
+        except (TypeError, ValueError):
+            pass
+        try:
+            bundle["complexity"] = max(0.0, min(1.0, float(data.get("complexity", 0.5))))
+        except (TypeError, ValueError):
+            pass
+        keywords = data.get("keywords")
+        if isinstance(keywords, list):
+            bundle["keywords"] = [str(kw).strip() for kw in keywords if str(kw).strip()][:10]
+
+        return bundle
+
+    # 实现LLMProvider抽象方法
+    async def analyze_sentiment(self, text: str) -> float:
+        """分析文本情感"""
+        bundle = await self.analyze_bundle(text)
+        return bundle["sentiment"]
 
     async def extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
         """提取关键词"""
-        prompt = f"""
-        从以下文本中提取{max_keywords}个最重要的关键词，以逗号分隔：
-        文本：{text}
-        只返回关键词列表，不要返回其他内容。
-        """
-        
-        messages = [{"role": "user", "content": prompt}]
-        response = await self.chat_completion(messages, temperature=0.3, max_tokens=100)
-        
-        keywords = []
-        if response.get("success") and "text" in response:
-            content = response["text"]
-            # 处理可能的关键词响应格式
-            if ',' in content:
-                potential_keywords = [kw.strip() for kw in content.split(",")]
-                for kw in potential_keywords:
-                    if kw and len(kw) <= 10:
-                        keywords.append(kw)
-            else:
-                # 尝试提取可能的关键词
-                import re
-                words = re.findall(r'[一-龯]{2,8}', content)
-                keywords = words[:max_keywords]
-        
-        # 如果没有提取到关键词，返回空列表
-        return keywords[:max_keywords] if keywords else []
+        bundle = await self.analyze_bundle(text)
+        return bundle["keywords"][:max_keywords]
 
     async def calculate_complexity(self, text: str) -> float:
         """计算语言复杂度"""
-        prompt = f"""
-        评估以下文本的语言复杂度，返回0到1之间的数值：
-        0表示非常简单，1表示非常复杂
-        考虑因素：句式复杂度、词汇难度、逻辑结构等
-        文本：{text}
-        只返回数字，不要返回其他内容。
+        bundle = await self.analyze_bundle(text)
+        return bundle["complexity"]
+
+    @staticmethod
+    def _clean_list_line(line: str, skip_prefixes: tuple) -> str:
+        """清洗生成结果的一行：去掉标题行和行首尾的序号标点"""
+        line = line.strip()
+        if not line or line.startswith(skip_prefixes):
+            return ""
+        return line.strip(_LIST_STRIP_CHARS)
+
+    async def _generate_list(self, prompt: str, skip_prefixes: tuple) -> List[str]:
+        """流式生成并按行增量收集列表项
+
+        等整段400 token生成完再切分，要付完整的生成延迟；这里边收
+        流边按换行切分清洗，后处理与生成重叠，第一条结果在生成中途
+        就已就绪。流式失败时回退一次非流式调用。
         """
-        
         messages = [{"role": "user", "content": prompt}]
-        response = await self.chat_completion(messages, temperature=0.0, max_tokens=10)
-        
-        if response.get("success") and "text" in response:
-            try:
-                # 提取数字
-                import re
-                numbers = re.findall(r'[-+]?\d*\.?\d+', response["text"])
-                if numbers:
-                    complexity = float(numbers[0])
-                    # 确保在0-1范围内
-                    return max(0.0, min(1.0, complexity))
-            except Exception as e:
-                logger.error(f"复杂度计算结果解析失败: {e}")
-        
-        return 0.5
+        items: List[str] = []
+        buffer = ""
+        try:
+            async for piece in self.chat_completion_stream(messages, temperature=0.8, max_tokens=400):
+                buffer += piece
+                while '\n' in buffer:
+                    line, buffer = buffer.split('\n', 1)
+                    cleaned = self._clean_list_line(line, skip_prefixes)
+                    if cleaned:
+                        items.append(cleaned)
+        except Exception as e:
+            logger.warning(f"流式生成失败，回退非流式调用: {e}")
+            response = await self.chat_completion(messages, temperature=0.8, max_tokens=400)
+            if not (response.get("success") and "text" in response):
+                return []
+            items = []
+            for line in response["text"].split('\n'):
+                cleaned = self._clean_list_line(line, skip_prefixes)
+                if cleaned:
+                    items.append(cleaned)
+            return items[:5]
+
+        # 流结束后缓冲里可能还剩最后一行（没有结尾换行符）
+        cleaned = self._clean_list_line(buffer, skip_prefixes)
+        if cleaned:
+            items.append(cleaned)
+        return items[:5]
 
     async def generate_insights(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
         """生成洞察"""
@@ -439,25 +753,11 @@ class PaddleLLMProvider(LLMProvider):
         情感分数：{sentiment_score} (范围-1到1，-1最消极，1最积极)
         关键词：{', '.join(keywords)}
         复杂度分数：{complexity_score} (范围0-1)
-        
+
         请用中文生成3-5个深度洞察，每个洞察一句话，格式简洁明了。
         """
-        
-        messages = [{"role": "user", "content": prompt}]
-        response = await self.chat_completion(messages, temperature=0.8, max_tokens=400)
-        
-        insights = []
-        if response.get("success") and "text" in response:
-            content = response["text"]
-            lines = content.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('#') and not line.startswith('洞察：'):
-                    cleaned = line.strip('123456789.-、。· ')
-                    if cleaned:
-                        insights.append(cleaned)
-        
-        return insights[:5] if insights else []
+
+        return await self._generate_list(prompt, ('#', '洞察：'))
 
     async def generate_recommendations(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
         """生成建议"""
@@ -467,25 +767,64 @@ class PaddleLLMProvider(LLMProvider):
         情感分数：{sentiment_score} (范围-1到1，-1最消极，1最积极)
         关键词：{', '.join(keywords)}
         复杂度分数：{complexity_score} (范围0-1)
-        
+
         请用中文生成3-5个实用建议，每个建议一句话，提供具体的改进方向。
         """
-        
-        messages = [{"role": "user", "content": prompt}]
-        response = await self.chat_completion(messages, temperature=0.8, max_tokens=400)
-        
-        recommendations = []
-        if response.get("success") and "text" in response:
-            content = response["text"]
-            lines = content.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('#') and not line.startswith('建议：'):
-                    cleaned = line.strip('123456789.-、。· ')
-                    if cleaned:
-                        recommendations.append(cleaned)
-        
-        return recommendations[:5] if recommendations else []
+
+        return await self._generate_list(prompt, ('#', '建议：'))
+
+    async def analyze_all(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+        """一次取得情感、关键词与复杂度（共用打包分析的单次调用）"""
+        bundle = await self.analyze_bundle(text)
+        return {
+            "sentiment": bundle["sentiment"],
+            "keywords": bundle["keywords"][:max_keywords],
+            "complexity": bundle["complexity"]
+        }
+
+    async def analyze_conversation(self, text: str) -> Dict[str, Any]:
+        """并发执行完整分析流程
+
+        情感、关键词、复杂度三个调用相互独立，洞察和建议只依赖
+        它们的结果。串行调用的总延迟是五次往返之和；这里分两轮
+        asyncio.gather并发，墙上时间降到两轮中各自最慢的一次。
+        单项失败降级为各自的默认值，不影响其余结果。
+        """
+        sentiment_score, keywords, complexity_score = await asyncio.gather(
+            self.analyze_sentiment(text),
+            self.extract_keywords(text),
+            self.calculate_complexity(text),
+            return_exceptions=True
+        )
+        if isinstance(sentiment_score, BaseException):
+            logger.error(f"情感分析失败: {sentiment_score}")
+            sentiment_score = 0.0
+        if isinstance(keywords, BaseException):
+            logger.error(f"关键词提取失败: {keywords}")
+            keywords = []
+        if isinstance(complexity_score, BaseException):
+            logger.error(f"复杂度计算失败: {complexity_score}")
+            complexity_score = 0.5
+
+        insights, recommendations = await asyncio.gather(
+            self.generate_insights(text, sentiment_score, keywords, complexity_score),
+            self.generate_recommendations(text, sentiment_score, keywords, complexity_score),
+            return_exceptions=True
+        )
+        if isinstance(insights, BaseException):
+            logger.error(f"洞察生成失败: {insights}")
+            insights = []
+        if isinstance(recommendations, BaseException):
+            logger.error(f"建议生成失败: {recommendations}")
+            recommendations = []
+
+        return {
+            "sentiment_score": sentiment_score,
+            "keywords": keywords,
+            "complexity_score": complexity_score,
+            "insights": insights,
+            "recommendations": recommendations
+        }
 
 
 # 飞桨平台客户端单例
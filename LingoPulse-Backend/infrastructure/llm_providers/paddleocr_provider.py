@@ -8,8 +8,52 @@ import base64
 import os
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
 import httpx
 
+# 兼容性处理 orjson（原生实现的JSON编解码，比标准库快数倍，
+# 对多MB的base64图像负载尤其明显）；缺失时退回标准库json
+try:
+    import orjson
+
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    def _json_loads(raw: bytes) -> Any:
+        return orjson.loads(raw)
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode()
+
+    def _json_loads(raw: bytes) -> Any:
+        return json.loads(raw)
+
+
+# 兼容性处理 aiofiles（异步文件读取，磁盘I/O期间不阻塞事件循环）；
+# 缺失时退回asyncio.to_thread把同步读取挪到工作线程
+try:
+    import aiofiles
+
+    async def _read_file(path: str) -> bytes:
+        async with aiofiles.open(path, 'rb') as f:
+            return await f.read()
+except ImportError:
+    def _read_file_sync(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    async def _read_file(path: str) -> bytes:
+        return await asyncio.to_thread(_read_file_sync, path)
+
+
+# JSON请求的内容类型放在请求级别：挂在客户端上会覆盖multipart的boundary
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _body_snippet(response: httpx.Response, limit: int = 2048) -> str:
+    """错误信息里只带响应体开头一段，免得整体解码大响应"""
+    return response.content[:limit].decode('utf-8', 'replace')
+
 
 class PaddleOCRProvider:
     """PaddleOCR MCP服务器提供商"""
@@ -32,7 +76,21 @@ class PaddleOCRProvider:
         self.paddle_url = paddle_url
         self.structure_url = structure_url
         self.use_mcp_server = use_mcp_server
-        
+
+        # 复用单个HTTP客户端：keep-alive连接池让后续请求跳过TCP/TLS握手，
+        # 认证头挂在客户端上，每次调用不再重建headers
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=30.0
+            ),
+            headers={
+                "Authorization": f"Bearer {access_token}"
+            }
+        )
+
         # MCP服务器配置（用于Claude Desktop集成）
         self.mcp_config = {
             "paddleocr-ocr": {
@@ -68,6 +126,18 @@ class PaddleOCRProvider:
     def generate_mcp_config(self) -> Dict[str, Any]:
         """生成Claude Desktop MCP配置文件"""
         return self.mcp_config
+
+    async def aclose(self):
+        """关闭HTTP客户端"""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """异步上下文管理器出口"""
+        await self.aclose()
     
     async def ocr_recognition(self, image_path: str, language: str = "chs") -> Dict[str, Any]:
         """
@@ -82,47 +152,85 @@ class PaddleOCRProvider:
         """
         try:
             print(f"🔍 PaddleOCR识别图像: {image_path}")
-            
-            # 读取图像文件并转为base64
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
-                base64_image = base64.b64encode(image_data).decode()
-            
+
+            # 异步读取原始字节：multipart直接传输，base64兜底时再编码
+            image_bytes = await _read_file(image_path)
+
+            return await self._ocr_from_bytes(image_bytes, os.path.basename(image_path), language)
+
+        except Exception as e:
+            error_msg = f"OCR识别失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
+    @staticmethod
+    def _shape_ocr_result(result: Dict[str, Any], language: str) -> Dict[str, Any]:
+        """把OCR API的原始响应整理成统一的返回结构"""
+        return {
+            "success": True,
+            "text": result.get("text", ""),
+            "confidence": result.get("confidence", 0.0),
+            "detected_texts": result.get("detected_texts", []),
+            "language_detected": result.get("language", language),
+            "method": "paddleocr_ocr"
+        }
+
+    async def _ocr_from_bytes(self, image_bytes: bytes, filename: str, language: str = "chs") -> Dict[str, Any]:
+        """优先用multipart上传原始图像字节，端点不接受时退回base64-in-JSON
+
+        base64把负载膨胀约33%，还要整块编码拷贝；multipart按原始字节传输，
+        对多MB截图既省带宽也省CPU。收到4xx说明端点只认JSON，兜底重发。
+        """
+        try:
+            response = await self.client.post(
+                self.paddle_url,
+                files={"image": (filename, image_bytes, "image/png")},
+                data={"language_type": language},
+                timeout=30.0
+            )
+
+            if response.status_code == 200:
+                return self._shape_ocr_result(_json_loads(response.content), language)
+
+            if 400 <= response.status_code < 500:
+                # 端点不支持multipart：退回base64-in-JSON
+                # （多MB图像的编码本身有几十毫秒CPU开销，挪到工作线程）
+                base64_image = (await asyncio.to_thread(base64.b64encode, image_bytes)).decode('ascii')
+                return await self._ocr_from_b64(base64_image, language)
+
+            error_msg = f"API请求失败: {response.status_code} - {_body_snippet(response)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
+        except Exception as e:
+            error_msg = f"OCR识别失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
+    async def _ocr_from_b64(self, base64_image: str, language: str = "chs") -> Dict[str, Any]:
+        """用已编码为base64的图像执行OCR识别"""
+        try:
             # 准备请求数据
             request_data = {
                 "image": base64_image,
                 "language_type": language
             }
-            
-            # 发送请求到PaddleOCR API
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.access_token}"
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.paddle_url,
-                    headers=headers,
-                    json=request_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "success": True,
-                        "text": result.get("text", ""),
-                        "confidence": result.get("confidence", 0.0),
-                        "detected_texts": result.get("detected_texts", []),
-                        "language_detected": result.get("language", language),
-                        "method": "paddleocr_ocr"
-                    }
-                else:
-                    error_msg = f"API请求失败: {response.status_code} - {response.text}"
-                    print(f"❌ {error_msg}")
-                    return {"success": False, "error": error_msg}
-                    
+
+            # 发送请求到PaddleOCR API（复用共享客户端的连接）
+            response = await self.client.post(
+                self.paddle_url,
+                content=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                timeout=30.0
+            )
+
+            if response.status_code == 200:
+                return self._shape_ocr_result(_json_loads(response.content), language)
+            else:
+                error_msg = f"API请求失败: {response.status_code} - {_body_snippet(response)}"
+                print(f"❌ {error_msg}")
+                return {"success": False, "error": error_msg}
+
         except Exception as e:
             error_msg = f"OCR识别失败: {str(e)}"
             print(f"❌ {error_msg}")
@@ -140,47 +248,81 @@ class PaddleOCRProvider:
         """
         try:
             print(f"📄 PaddleOCR文档分析: {image_path}")
-            
-            # 读取图像文件并转为base64
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
-                base64_image = base64.b64encode(image_data).decode()
-            
+
+            # 异步读取原始字节：multipart直接传输，base64兜底时再编码
+            image_bytes = await _read_file(image_path)
+
+            return await self._structure_from_bytes(image_bytes, os.path.basename(image_path))
+
+        except Exception as e:
+            error_msg = f"文档结构分析失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
+    @staticmethod
+    def _shape_structure_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """把结构分析API的原始响应整理成统一的返回结构"""
+        return {
+            "success": True,
+            "markdown_content": result.get("markdown", ""),
+            "json_structure": result.get("structure", {}),
+            "pages": result.get("pages", []),
+            "elements": result.get("elements", []),
+            "method": "paddleocr_structure"
+        }
+
+    async def _structure_from_bytes(self, image_bytes: bytes, filename: str) -> Dict[str, Any]:
+        """优先用multipart上传原始图像字节做结构分析，4xx时退回base64-in-JSON"""
+        try:
+            response = await self.client.post(
+                self.structure_url,
+                files={"image": (filename, image_bytes, "image/png")},
+                data={"output_format": "markdown"},
+                timeout=60.0
+            )
+
+            if response.status_code == 200:
+                return self._shape_structure_result(_json_loads(response.content))
+
+            if 400 <= response.status_code < 500:
+                # 端点不支持multipart：退回base64-in-JSON
+                # （多MB图像的编码本身有几十毫秒CPU开销，挪到工作线程）
+                base64_image = (await asyncio.to_thread(base64.b64encode, image_bytes)).decode('ascii')
+                return await self._structure_from_b64(base64_image)
+
+            error_msg = f"文档分析失败: {response.status_code} - {_body_snippet(response)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
+        except Exception as e:
+            error_msg = f"文档结构分析失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
+    async def _structure_from_b64(self, base64_image: str) -> Dict[str, Any]:
+        """用已编码为base64的图像执行文档结构分析"""
+        try:
             # 准备请求数据
             request_data = {
                 "image": base64_image,
                 "output_format": "markdown"  # 或 "json"
             }
-            
-            # 发送请求到PP-StructureV3 API
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.access_token}"
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.structure_url,
-                    headers=headers,
-                    json=request_data,
-                    timeout=60.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "success": True,
-                        "markdown_content": result.get("markdown", ""),
-                        "json_structure": result.get("structure", {}),
-                        "pages": result.get("pages", []),
-                        "elements": result.get("elements", []),
-                        "method": "paddleocr_structure"
-                    }
-                else:
-                    error_msg = f"文档分析失败: {response.status_code} - {response.text}"
-                    print(f"❌ {error_msg}")
-                    return {"success": False, "error": error_msg}
-                    
+
+            # 发送请求到PP-StructureV3 API（复用共享客户端的连接）
+            response = await self.client.post(
+                self.structure_url,
+                content=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                timeout=60.0
+            )
+
+            if response.status_code == 200:
+                return self._shape_structure_result(_json_loads(response.content))
+            else:
+                error_msg = f"文档分析失败: {response.status_code} - {_body_snippet(response)}"
+                print(f"❌ {error_msg}")
+                return {"success": False, "error": error_msg}
+
         except Exception as e:
             error_msg = f"文档结构分析失败: {str(e)}"
             print(f"❌ {error_msg}")
@@ -197,11 +339,21 @@ class PaddleOCRProvider:
             分析结果
         """
         print(f"💬 分析微信聊天记录: {image_path}")
-        
+
+        # 图像只读一遍（异步，不阻塞事件循环）：两个并行分析共享同一份
+        # 原始字节，省掉重复的文件I/O；multipart路径下连base64编码都不需要
+        try:
+            image_bytes = await _read_file(image_path)
+        except Exception as e:
+            error_msg = f"微信图片分析失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg}
+
         # 并行执行OCR和文档结构分析
-        ocr_task = asyncio.create_task(self.ocr_recognition(image_path))
-        structure_task = asyncio.create_task(self.document_structure_analysis(image_path))
-        
+        filename = os.path.basename(image_path)
+        ocr_task = asyncio.create_task(self._ocr_from_bytes(image_bytes, filename))
+        structure_task = asyncio.create_task(self._structure_from_bytes(image_bytes, filename))
+
         try:
             ocr_result, structure_result = await asyncio.gather(ocr_task, structure_task)
             
@@ -229,34 +381,55 @@ class PaddleOCRProvider:
             return {"success": False, "error": error_msg}
 
 
-# 全局PaddleOCR客户端实例
+# 全局PaddleOCR客户端实例（锁保护懒初始化：并发的首批调用
+# 同时看到None时，不加锁会各自建一个客户端，其余的连带连接池被泄漏）
 _paddleocr_client: Optional[PaddleOCRProvider] = None
+_paddleocr_client_lock = asyncio.Lock()
 
 
 async def get_paddleocr_client(access_token: str = None) -> PaddleOCRProvider:
     """获取PaddleOCR客户端实例"""
     global _paddleocr_client
-    
+
     if _paddleocr_client is None:
-        if not access_token:
-            # 从环境变量获取访问令牌
-            from dotenv import load_dotenv
-            import os
-            
-            load_dotenv()
-            access_token = os.getenv("PADDLEOCR_ACCESS_TOKEN", "06e462ca9e7d5ad023db6205b7e4ecdd3f06ec2a")
-        
-        _paddleocr_client = PaddleOCRProvider(
-            access_token=access_token
-        )
-    
+        async with _paddleocr_client_lock:
+            if _paddleocr_client is None:
+                if not access_token:
+                    # 从环境变量获取访问令牌
+                    from dotenv import load_dotenv
+
+                    load_dotenv()
+                    access_token = os.getenv("PADDLEOCR_ACCESS_TOKEN", "06e462ca9e7d5ad023db6205b7e4ecdd3f06ec2a")
+
+                _paddleocr_client = PaddleOCRProvider(
+                    access_token=access_token
+                )
+
     return _paddleocr_client
 
 
 async def close_paddleocr_client():
     """关闭PaddleOCR客户端"""
     global _paddleocr_client
-    _paddleocr_client = None
+
+    async with _paddleocr_client_lock:
+        if _paddleocr_client is not None:
+            await _paddleocr_client.aclose()
+            _paddleocr_client = None
+
+
+@asynccontextmanager
+async def paddleocr_lifespan(access_token: str = None):
+    """应用生命周期集成：启动时建好客户端，关闭时释放连接
+
+    接入FastAPI的lifespan（或任何async with块），保证进程退出前
+    连接池被正确关闭，不留悬挂的socket。
+    """
+    client = await get_paddleocr_client(access_token)
+    try:
+        yield client
+    finally:
+        await close_paddleocr_client()
 
 
 # 测试函数
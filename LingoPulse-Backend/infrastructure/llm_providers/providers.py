@@ -2,12 +2,143 @@
 Infrastructure Layer - LLM Providers
 基础设施层 - LLM提供商接口
 """
+import asyncio
+import hashlib
+import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, AsyncIterator, Optional
 from dataclasses import dataclass
 import httpx
 import json
 
+# 模块级共享HTTP客户端（懒初始化，双重检查加锁）：每个提供商实例
+# 各建一个客户端时，并发请求各付一次TCP+TLS握手；共享连接池让
+# 所有提供商的请求都复用keep-alive连接
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+_shared_client_lock = asyncio.Lock()
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """获取共享的HTTP客户端实例"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None:
+        async with _shared_client_lock:
+            if _SHARED_CLIENT is None:
+                _SHARED_CLIENT = httpx.AsyncClient(
+                    timeout=120.0,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=100,
+                        max_connections=200
+                    )
+                )
+    return _SHARED_CLIENT
+
+
+async def close_shared_client():
+    """关闭共享HTTP客户端（应用关闭时统一调用）"""
+    global _SHARED_CLIENT
+    async with _shared_client_lock:
+        if _SHARED_CLIENT is not None:
+            await _SHARED_CLIENT.aclose()
+            _SHARED_CLIENT = None
+
+
+# 本地情感分析的词表：按强度分级的模块级frozenset，
+# 每次调用不再重建五个集合和修饰词字典
+_VERY_POSITIVE_WORDS = frozenset({'太好了', '完美', '杰出', '出色', '感动', '激动', '崇拜', '敬佩', '爱死', '超级棒', '惊艳', '震撼'})
+_POSITIVE_WORDS = frozenset({'好', '棒', '优秀', '喜欢', '高兴', '快乐', '满意', '赞', '精彩', '幸福', '美好', '愉快', '开心', '感谢', '感恩'})
+_NEUTRAL_WORDS = frozenset({'还行', '一般', '普通', '平常', '中规中矩', '可以', '凑合'})
+_NEGATIVE_WORDS = frozenset({'坏', '差', '讨厌', '恨', '难过', '失望', '沮丧', '痛苦', '悲伤', '愤怒', '焦虑', '担心', '害怕', '绝望', '无聊', '烦躁'})
+_VERY_NEGATIVE_WORDS = frozenset({'糟糕', '恶劣', '可怕', '崩溃', '绝望', '恶心', '反感', '愤慨', '仇恨', '恐怖'})
+
+# 词 -> 类别下标（0极积极 1积极 2中性 3消极 4极消极）：
+# 一次字典查询替代对五个集合的五次成员测试
+_WORD_CAT = {
+    **{w: 0 for w in _VERY_POSITIVE_WORDS},
+    **{w: 1 for w in _POSITIVE_WORDS},
+    **{w: 2 for w in _NEUTRAL_WORDS},
+    **{w: 3 for w in _NEGATIVE_WORDS},
+    **{w: 4 for w in _VERY_NEGATIVE_WORDS},
+}
+
+# 情感强度修饰词
+_INTENSITY_MODIFIERS = {
+    '非常': 1.3, '特别': 1.2, '极其': 1.5, '超级': 1.4, '十分': 1.2, '相当': 1.1,
+    '格外': 1.2, '超': 1.4, '太': 1.2, '真的': 1.1, '确实': 1.1,
+    '挺': 1.0, '蛮': 1.0, '蛮好': 1.1, '挺棒': 1.1
+}
+
+# 关键词提取与复杂度计算的常量：正则、停用词表和标点集只建一次
+_SENT_SPLIT = re.compile(r'[。！？.!?]+')
+_PUNCT_STRIP = '，。！？；：""''()（）'
+_STOP_WORDS = frozenset({
+    '的', '了', '是', '在', '有', '和', '与', '或', '但', '而', '因为', '所以',
+    '这个', '那个', '一个', '一些', '很', '非常', '也', '都', '还', '就',
+    '如果', '虽然', '可是', '不过', '然而', '因此', '而且', '或者',
+    '什么', '怎么', '为什么', '如何', '哪里', '谁', '吗', '呢', '地', '得'
+})
+_CJK_PUNCT = frozenset({'，', '、', '；', '：', '——', '…', '（', '）', '《', '》'})
+# 标点删除表：len(text) - len(text.translate(...))在C层一遍扫完全文，
+# 替代逐字符的Python循环（多字符条目本就匹配不到单字符，排除在外）
+_PUNCT_DEL_TABLE = {ord(c): None for c in _CJK_PUNCT if len(c) == 1}
+_LOGICAL_WORDS = frozenset({
+    '因为', '所以', '但是', '然而', '如果', '虽然', '即使', '因此', '此外',
+    '另外', '而且', '或者', '以及', '或者说', '更重要', '值得注意的是'
+})
+
+
+# 百度响应解析的预编译正则与序号剥离字符集（保留strip的仅修剪
+# 两端语义，前缀正则会漏掉行尾的句号等标点）
+_NUM_RE = re.compile(r'[-+]?\d*\.?\d+')
+_JSON_RE = re.compile(r'\{.*\}', re.S)
+_CJK_WORD_RE = re.compile(r'[一-龯]{2,8}')
+_QUOTED_ITEM_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_LIST_MARK_STRIP = '123456789.-、。· '
+
+
+def _text_digest(text: str) -> bytes:
+    """文本的定长摘要，用作缓存键（比整串文本做键省内存）"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class _AsyncLRU:
+    """带single-flight合并的异步LRU缓存
+
+    相同键的并发调用共享同一个进行中的任务，不会重复发起上游请求；
+    命中时用一次字典探查换掉整次HTTPS往返。
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, asyncio.Task]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def get_or_create(self, key, factory):
+        """按键取缓存任务，缺失时用factory创建并登记"""
+        async with self._lock:
+            task = self._entries.get(key)
+            if task is None:
+                task = asyncio.ensure_future(factory())
+                self._entries[key] = task
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+        try:
+            return await task
+        except Exception:
+            # 抛异常的结果不留在缓存里，下次调用重新发起
+            async with self._lock:
+                if self._entries.get(key) is task:
+                    del self._entries[key]
+            raise
+
+    async def clear(self):
+        """清空缓存"""
+        async with self._lock:
+            self._entries.clear()
+
 
 @dataclass
 class LLMResponse:
@@ -40,6 +171,32 @@ class LLMProvider(ABC):
     async def calculate_complexity(self, text: str) -> float:
         """计算语言复杂度"""
         pass
+
+    async def analyze_bundle(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+        """并发执行三项基础分析，返回 {sentiment, keywords, complexity}
+
+        三个调用相互独立，串行await要付三倍网络延迟；gather让它们
+        同时在途，在共享连接池上复用keep-alive连接，总延迟降到最慢
+        一项的水平。提供商可覆写本方法共享上游调用。
+        """
+        sentiment, keywords, complexity = await asyncio.gather(
+            self.analyze_sentiment(text),
+            self.extract_keywords(text, max_keywords),
+            self.calculate_complexity(text)
+        )
+        return {
+            "sentiment": sentiment,
+            "keywords": keywords,
+            "complexity": complexity
+        }
+
+    async def analyze_all(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+        """一次取得情感、关键词与复杂度
+
+        默认委托给analyze_bundle的并发实现；支持批量提示词的
+        提供商应覆写本方法，把三次网络往返合并成一次。
+        """
+        return await self.analyze_bundle(text, max_keywords)
 # class WenxinProvider(LLMProvider):
 #     """文心一言提供商"""
     
@@ -120,8 +277,9 @@ class LLMProvider(ABC):
 #     async def calculate_complexity(self, text: str) -> float:
 #         """计算语言复杂度"""
 #         try:
-#             # 简化实现：基于句子长度和词汇复杂度
-#             sentences = text.split('。') + text.split('.') + text.split('!') + text.split('?')
+#             # 简化实现：基于句子长度和词汇复杂度（单次正则切分，
+#             # 四次split+拼接要扫描全文四遍还产生四个中间列表）
+#             sentences = _SENT_SPLIT.split(text)
 #             if sentences:
 #                 avg_length = sum(len(s.split()) for s in sentences) / len(sentences)
 #                 return min(avg_length / 20, 1.0)
@@ -140,56 +298,53 @@ class LocalModelProvider(LLMProvider):
     def __init__(self, model_path: str):
         super().__init__("", "")
         self.model_path = model_path
-        self.client = httpx.AsyncClient()
         print("🤖 初始化本地AI模型提供商（增强版）")
     
     async def analyze_sentiment(self, text: str) -> float:
         """分析文本情感 - 增强本地实现"""
         print(f"🔍 本地AI分析情感: {text[:30]}...")
         
-        # 更丰富的情感词汇库，按强度分级
-        very_positive_words = {'太好了', '完美', '杰出', '出色', '感动', '激动', '崇拜', '敬佩', '爱死', '超级棒', '惊艳', '震撼'}
-        positive_words = {'好', '棒', '优秀', '喜欢', '高兴', '快乐', '满意', '赞', '精彩', '幸福', '美好', '愉快', '开心', '感谢', '感恩'}
-        neutral_words = {'还行', '一般', '普通', '平常', '中规中矩', '可以', '凑合'}
-        negative_words = {'坏', '差', '讨厌', '恨', '难过', '失望', '沮丧', '痛苦', '悲伤', '愤怒', '焦虑', '担心', '害怕', '绝望', '无聊', '烦躁'}
-        very_negative_words = {'糟糕', '恶劣', '可怕', '崩溃', '绝望', '恶心', '反感', '愤慨', '仇恨', '恐怖'}
-        
-        # 更细致的情感分析
+        # 更细致的情感分析：只分词一次，词数和字符数算一次随行携带
         words = text.split()
-        
-        # 基础统计
-        very_positive_count = sum(1 for word in words if word in very_positive_words)
-        positive_count = sum(1 for word in words if word in positive_words)
-        neutral_count = sum(1 for word in words if word in neutral_words)
-        negative_count = sum(1 for word in words if word in negative_words)
-        very_negative_count = sum(1 for word in words if word in very_negative_words)
-        
-        # 情感强度修饰词
-        intensity_modifiers = {
-            '非常': 1.3, '特别': 1.2, '极其': 1.5, '超级': 1.4, '十分': 1.2, '相当': 1.1, 
-            '格外': 1.2, '超': 1.4, '太': 1.2, '特别': 1.2, '真的': 1.1, '确实': 1.1,
-            '挺': 1.0, '蛮': 1.0, '蛮好': 1.1, '挺棒': 1.1
-        }
-        
-        # 应用强度修饰
-        for word in words:
-            if word in intensity_modifiers:
-                modifier = intensity_modifiers[word]
-                # 向前查找一个词看是否匹配情感词
-                for i in range(len(words)-1):
-                    if i < len(words)-1 and words[i] == word:
-                        next_word = words[i+1]
-                        if next_word in positive_words or next_word in very_positive_words:
-                            positive_count *= modifier
-                        elif next_word in negative_words or next_word in very_negative_words:
-                            negative_count *= modifier
+        word_count = len(words)
+        word_denom = max(word_count, 1)
+        char_count = len(text)
+
+        # 单次遍历统计五类情感词并处理强度修饰：一次_WORD_CAT查询替代
+        # 对五个集合的五次成员测试；修饰词只看紧随其后的一个词，
+        # 按增量累加强度（旧实现对每个修饰词重扫全文，O(N^2)，
+        # 且反复乘总计数导致同一修饰词的影响被放大多次）
+        counts = [0, 0, 0, 0, 0]
+        positive_boost = 0.0
+        negative_boost = 0.0
+        last_index = word_count - 1
+        # 把两张表的.get绑定到局部变量：热循环里每个词省掉两次
+        # 属性查找，这是纯Python下最接近"每词一次哈希探查"的写法
+        word_cat = _WORD_CAT.get
+        modifiers = _INTENSITY_MODIFIERS.get
+        for i, word in enumerate(words):
+            idx = word_cat(word)
+            if idx is not None:
+                counts[idx] += 1
+            modifier = modifiers(word)
+            if modifier is not None and i < last_index:
+                next_idx = word_cat(words[i + 1])
+                if next_idx is not None:
+                    # 0/1为积极类，3/4为消极类；modifier=1.0的修饰词无增益
+                    if next_idx <= 1:
+                        positive_boost += modifier - 1.0
+                    elif next_idx >= 3:
+                        negative_boost += modifier - 1.0
+        very_positive_count, positive_count, neutral_count, negative_count, very_negative_count = counts
+        positive_count += positive_boost
+        negative_count += negative_boost
         
         # 文本长度和复杂度影响
-        text_complexity = min(len(text) / 100, 1.0)
-        
+        text_complexity = min(char_count / 100, 1.0)
+
         # 计算最终情感分数 - 使用加权计算
-        positive_score = (positive_count * 1.0 + very_positive_count * 1.5) / max(len(words), 1) * 0.8
-        negative_score = (negative_count * 1.0 + very_negative_count * 1.5) / max(len(words), 1) * 0.8
+        positive_score = (positive_count * 1.0 + very_positive_count * 1.5) / word_denom * 0.8
+        negative_score = (negative_count * 1.0 + very_negative_count * 1.5) / word_denom * 0.8
         
         # 考虑标点符号
         exclamation_count = text.count('!') + text.count('！')
@@ -201,11 +356,12 @@ class LocalModelProvider(LLMProvider):
         sentiment = max(-1.0, min(1.0, sentiment))
         
         # 如果没有任何情感词，基于文本特征给出大致判断
-        if very_positive_count + positive_count + neutral_count + negative_count + very_negative_count == 0:
+        # （counts是未加增幅的原始计数，求和即可判断有无情感词）
+        if sum(counts) == 0:
             # 基于文本长度和特征给出基础情感判断
             if '?' in text or '？' in text:
                 sentiment = 0.1  # 问题通常表示中性到轻微积极
-            elif len(text) > 50:
+            elif char_count > 50:
                 sentiment = 0.05  # 长文本通常比较中性
             else:
                 sentiment = 0.0
@@ -217,27 +373,14 @@ class LocalModelProvider(LLMProvider):
         """提取关键词 - 增强本地实现"""
         print(f"🔍 本地AI提取关键词: {text[:30]}...")
         
-        # 停用词列表
-        stop_words = {
-            '的', '了', '是', '在', '有', '和', '与', '或', '但', '而', '因为', '所以', 
-            '这个', '那个', '一个', '一些', '很', '非常', '也', '都', '还', '就', 
-            '如果', '虽然', '可是', '不过', '然而', '因此', '所以', '而且', '或者',
-            '什么', '怎么', '为什么', '如何', '哪里', '谁', '吗', '呢', '的', '地', '得'
-        }
-        
-        # 关键词提取逻辑
-        words = text.split()
-        word_freq = {}
-        
-        # 统计词频
-        for word in words:
-            clean_word = word.strip('，。！？；：""''()（）').lower()
-            if clean_word and len(clean_word) > 1 and clean_word not in stop_words:
-                word_freq[clean_word] = word_freq.get(clean_word, 0) + 1
-        
-        # 按频率排序并提取关键词
-        keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        result = [word for word, freq in keywords[:max_keywords]]
+        # 词频统计走Counter：计数在C层完成，most_common用堆取top-K
+        # （O(N log K)），不必为前几名对全部词项做完整排序
+        word_freq = Counter(
+            clean_word
+            for clean_word in (word.strip(_PUNCT_STRIP).lower() for word in text.split())
+            if clean_word and len(clean_word) > 1 and clean_word not in _STOP_WORDS
+        )
+        result = [word for word, freq in word_freq.most_common(max_keywords)]
         
         print(f"📊 关键词提取结果: {result}")
         return result
@@ -247,32 +390,32 @@ class LocalModelProvider(LLMProvider):
         print(f"🧠 本地AI计算复杂度: {text[:30]}...")
         
         try:
-            import re
-            
-            # 分析语言复杂度指标
+            # 分析语言复杂度指标（句子切分用模块级预编译正则）；
+            # 全文只分词一次，词数和字符数随行携带供各指标复用
             words = text.split()
-            sentences = re.split(r'[。！？.!?]+', text)
+            word_count = len(words)
+            word_denom = max(word_count, 1)
+            char_count = len(text)
+            sentences = _SENT_SPLIT.split(text)
             sentences = [s.strip() for s in sentences if s.strip()]
-            
+
             # 指标1: 平均句长
             if sentences:
                 avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
             else:
-                avg_sentence_length = len(words)
-            
+                avg_sentence_length = word_count
+
             # 指标2: 词汇多样性（不同词汇占总词汇的比例）
             unique_words = set(words)
-            lexical_diversity = len(unique_words) / max(len(words), 1)
-            
-            # 指标3: 标点符号复杂度
-            punctuation_marks = ['，', '、', '；', '：', '——', '…', '…', '（', '）', '《', '》']
-            punctuation_count = sum(1 for char in text if char in punctuation_marks)
-            punctuation_density = punctuation_count / max(len(text), 1)
-            
+            lexical_diversity = len(unique_words) / word_denom
+
+            # 指标3: 标点符号复杂度（translate删除表让计数走C实现）
+            punctuation_count = char_count - len(text.translate(_PUNCT_DEL_TABLE))
+            punctuation_density = punctuation_count / max(char_count, 1)
+
             # 指标4: 连接词和逻辑词使用
-            logical_words = ['因为', '所以', '但是', '然而', '如果', '虽然', '即使', '因此', '此外', '另外', '而且', '或者', '以及', '或者说', '更重要', '值得注意的是']
-            logical_count = sum(1 for word in words if word in logical_words)
-            logical_density = logical_count / max(len(words), 1)
+            logical_count = sum(1 for word in words if word in _LOGICAL_WORDS)
+            logical_density = logical_count / word_denom
             
             # 综合复杂度计算
             length_factor = min(avg_sentence_length / 15, 1.0)  # 句长因子
@@ -292,14 +435,14 @@ class LocalModelProvider(LLMProvider):
             print(f"🎯 复杂度分析: {final_complexity:.3f} (句长:{avg_sentence_length:.1f}, 多样性:{lexical_diversity:.2f})")
             
             return final_complexity
-            
+
         except Exception as e:
             print(f"❌ 复杂度计算失败: {e}")
             return 0.5
-    
+
     async def close(self):
-        """关闭客户端"""
-        await self.client.aclose()
+        """关闭提供商（共享HTTP客户端由close_shared_client统一关闭）"""
+        pass
 
 
 class BaiduAistudioProvider(LLMProvider):
@@ -307,11 +450,50 @@ class BaiduAistudioProvider(LLMProvider):
     
     def __init__(self, access_token: str):
         super().__init__(access_token, "https://aistudio.baidu.com/llm/lmapi/v3")
-        self.client = httpx.AsyncClient(timeout=120.0)  # 设置120秒超时
         self.model = "ernie-3.5-8k"  # 修复模型名称
+        # 按(方法, 模型, 文本摘要)键缓存分析结果：同一段话在洞察和
+        # 建议路径里经常被重复打分，命中省掉整次HTTPS往返；
+        # 并发的相同调用合并为一次上游请求
+        self._cache = _AsyncLRU(maxsize=1024)
         print("🤖 初始化百度AI Studio推理模型提供商")
-    
+
+    async def cache_clear(self):
+        """清空分析结果缓存"""
+        await self._cache.clear()
+
     async def analyze_sentiment(self, text: str) -> float:
+        """分析文本情感（按文本缓存）"""
+        key = ("sentiment", self.model, _text_digest(text))
+        return await self._cache.get_or_create(key, lambda: self._analyze_sentiment(text))
+
+    async def extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
+        """提取关键词（按文本缓存）"""
+        key = ("keywords", self.model, _text_digest(text), max_keywords)
+        return await self._cache.get_or_create(key, lambda: self._extract_keywords(text, max_keywords))
+
+    async def calculate_complexity(self, text: str) -> float:
+        """计算语言复杂度（按文本缓存）"""
+        key = ("complexity", self.model, _text_digest(text))
+        return await self._cache.get_or_create(key, lambda: self._calculate_complexity(text))
+
+    async def analyze_all(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+        """批量分析（按文本缓存）"""
+        key = ("all", self.model, _text_digest(text), max_keywords)
+        return await self._cache.get_or_create(key, lambda: self._analyze_all(text, max_keywords))
+
+    async def generate_insights(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
+        """生成洞察（按对话与分析参数缓存）"""
+        key = ("insights", self.model, _text_digest(dialogue), sentiment_score, tuple(keywords), complexity_score)
+        return await self._cache.get_or_create(
+            key, lambda: self._generate_insights(dialogue, sentiment_score, keywords, complexity_score))
+
+    async def generate_recommendations(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
+        """生成建议（按对话与分析参数缓存）"""
+        key = ("recommendations", self.model, _text_digest(dialogue), sentiment_score, tuple(keywords), complexity_score)
+        return await self._cache.get_or_create(
+            key, lambda: self._generate_recommendations(dialogue, sentiment_score, keywords, complexity_score))
+
+    async def _analyze_sentiment(self, text: str) -> float:
         """分析文本情感"""
         prompt = f"""
         分析以下文本的情感倾向，返回-1到1之间的数值：
@@ -320,7 +502,7 @@ class BaiduAistudioProvider(LLMProvider):
         """
         
         try:
-            response = await self.client.post(
+            response = await (await _get_client()).post(
                 f"{self.base_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -339,9 +521,8 @@ class BaiduAistudioProvider(LLMProvider):
                 content = result["choices"][0]["message"]["content"].strip()
                 print(f"🔍 百度API情感分析原始响应: {content}")
                 
-                # 提取数值
-                import re
-                numbers = re.findall(r'[-+]?\d*\.?\d+', content)
+                # 提取数值（预编译的模块级正则）
+                numbers = _NUM_RE.findall(content)
                 if numbers:
                     try:
                         sentiment_score = float(numbers[0])
@@ -363,7 +544,7 @@ class BaiduAistudioProvider(LLMProvider):
             print(f"百度AI Studio情感分析失败: {e}")
             return 0.0
     
-    async def extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
+    async def _extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
         """提取关键词"""
         prompt = f"""
         从以下文本中提取{max_keywords}个最重要的关键词，以逗号分隔：
@@ -371,7 +552,7 @@ class BaiduAistudioProvider(LLMProvider):
         """
         
         try:
-            response = await self.client.post(
+            response = await (await _get_client()).post(
                 f"{self.base_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -391,7 +572,6 @@ class BaiduAistudioProvider(LLMProvider):
                 print(f"🔍 百度API关键词提取原始响应: {content}")
                 
                 # 处理可能的关键词响应格式
-                import re
                 keywords = []
                 
                 # 尝试以逗号分隔
@@ -404,7 +584,7 @@ class BaiduAistudioProvider(LLMProvider):
                 # 如果没有逗号分隔，尝试提取可能的关键词
                 if not keywords:
                     # 寻找可能是关键词的短词组
-                    words = re.findall(r'[一-龯]{2,8}', content)
+                    words = _CJK_WORD_RE.findall(content)
                     keywords = words[:max_keywords]
                 
                 # 如果还是找不到，返回一些默认关键词
@@ -422,7 +602,7 @@ class BaiduAistudioProvider(LLMProvider):
             print(f"百度AI Studio关键词提取失败: {e}")
             return []
     
-    async def calculate_complexity(self, text: str) -> float:
+    async def _calculate_complexity(self, text: str) -> float:
         """计算语言复杂度"""
         prompt = f"""
         评估以下文本的语言复杂度，返回0到1之间的数值：
@@ -432,7 +612,7 @@ class BaiduAistudioProvider(LLMProvider):
         """
         
         try:
-            response = await self.client.post(
+            response = await (await _get_client()).post(
                 f"{self.base_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -461,18 +641,21 @@ class BaiduAistudioProvider(LLMProvider):
             print(f"百度AI Studio复杂度计算失败: {e}")
             return 0.5
 
-    async def generate_insights(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
-        """使用百度AI Studio生成洞察"""
-        try:
-            prompt = f"""基于以下对话内容生成3-5个深度洞察：
-对话内容：{dialogue}
-情感分数：{sentiment_score} (范围-1到1，-1最消极，1最积极)
-关键词：{', '.join(keywords)}
-复杂度分数：{complexity_score} (范围0-1)
+    async def _analyze_all(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+        """一次请求同时取得情感、关键词与复杂度
 
-请用中文生成3-5个深度洞察，每个洞察一句话，格式简洁明了。"""
-            
-            response = await self.client.post(
+        三个单项方法各付一次HTTPS往返，文本在提示词里重复发送
+        三遍；这里让模型直接返回一个JSON对象，网络往返和token
+        开销都降为三分之一。解析失败时回退基类的并发单项调用。
+        """
+        prompt = f"""对以下文本同时完成三项分析，只返回一个JSON对象，不要返回其他内容：
+{{"sentiment": -1到1之间的情感分数, "keywords": 最多{max_keywords}个关键词的数组, "complexity": 0到1之间的复杂度}}
+情感：-1表示强烈负面，0表示中性，1表示强烈正面
+复杂度：考虑句式复杂度、词汇难度、逻辑结构等，0最简单，1最复杂
+文本：{text}"""
+
+        try:
+            response = await (await _get_client()).post(
                 f"{self.base_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -481,54 +664,168 @@ class BaiduAistudioProvider(LLMProvider):
                 json={
                     "model": self.model,
                     "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 400,
-                    "temperature": 0.8
+                    "max_tokens": 300,
+                    "temperature": 0.3
                 }
             )
-            
+
             if response.status_code == 200:
-                try:
-                    result = response.json()
-                    print(f"🔍 洞察生成API原始响应: {result}")
-                    content = result["choices"][0]["message"]["content"]
-                    print(f"🔍 洞察生成内容: {content}")
-                    
-                    # 解析洞察
-                    insights = []
-                    lines = content.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line and not line.startswith('#') and not line.startswith('洞察：'):
-                            # 移除序号和常见前缀
-                            cleaned = line.strip('123456789.-、。· ')
-                            if cleaned:
-                                insights.append(cleaned)
-                    
-                    if not insights:
-                        # 如果解析失败，尝试按其他方式解析
-                        content = content.replace('洞察：', '').replace('洞察:', '')
-                        lines = [line.strip() for line in content.split('\n') if line.strip() and not line.startswith('洞察')]
-                        insights = [line.strip('123456789.-、。· ') for line in lines if line.strip()]
-                    
-                    result_insights = insights[:5] if insights else ["对话分析洞察生成完成"]
-                    print(f"🤖 百度AI生成洞察: {result_insights}")
-                    return result_insights
-                except Exception as parse_error:
-                    print(f"❌ 洞察响应解析错误: {parse_error}")
-                    print(f"❌ 原始响应: {result}")
-                    return ["AI洞察生成失败，使用基础洞察"]
+                result = response.json()
+                content = result["choices"][0]["message"]["content"]
+
+                # 截取JSON对象部分，容忍前后的多余文字
+                match = _JSON_RE.search(content)
+                if match:
+                    data = json.loads(match.group(0))
+                    keywords = data.get("keywords")
+                    if not isinstance(keywords, list):
+                        keywords = []
+                    analysis = {
+                        "sentiment": max(-1.0, min(1.0, float(data.get("sentiment", 0.0)))),
+                        "keywords": [str(kw).strip() for kw in keywords if str(kw).strip()][:max_keywords],
+                        "complexity": max(0.0, min(1.0, float(data.get("complexity", 0.5))))
+                    }
+                    print(f"📊 批量分析结果: {analysis}")
+                    return analysis
+                print(f"❌ 批量分析未返回JSON: {content[:100]}")
             else:
-                print(f"❌ 百度AI洞察生成API错误: {response.status_code}")
-                return ["AI洞察生成失败，使用基础洞察"]
-                
+                print(f"百度AI Studio API错误: {response.status_code}")
+
+        except Exception as e:
+            print(f"百度AI Studio批量分析失败: {e}")
+
+        # 回退：并发执行三个单项调用
+        return await super().analyze_all(text, max_keywords)
+
+    async def _stream_chat(self, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        """流式对话生成，按增量文本逐段产出
+
+        非流式调用要等整段生成完才拿到第一字节；走SSE流后首个
+        token一到就交给调用方，解析与生成重叠进行，调用方凑够
+        所需内容还能提前断流，省掉剩余token的生成时间。
+        """
+        client = await _get_client()
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                **params,
+                "model": self.model,
+                "messages": messages,
+                "stream": True
+            }
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"百度AI流式API错误: {response.status_code}")
+            async for line in response.aiter_lines():
+                # SSE格式：每个数据块一行"data: {...}"，[DONE]表示结束
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if not payload or payload == "[DONE]":
+                    continue
+                try:
+                    chunk = json.loads(payload)
+                except ValueError:
+                    continue
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                piece = choices[0].get("delta", {}).get("content") or ""
+                if piece:
+                    yield piece
+
+    @staticmethod
+    def _parse_list_payload(content: str, key: str) -> List[str]:
+        """从（可能不完整的）JSON响应中提取已生成完的列表项
+
+        流式输出进行到一半时整个对象还无法json.loads，这里先试
+        完整解析，失败再收集数组里已经闭合的字符串字面量，
+        供调用方判断是否可以提前停流。
+        """
+        match = _JSON_RE.search(content)
+        if match:
+            try:
+                data = json.loads(match.group(0))
+                items = data.get(key)
+                if isinstance(items, list):
+                    return [str(item).strip() for item in items if str(item).strip()]
+            except Exception:
+                pass
+        # 对象尚未闭合：只取数组部分里已闭合的字符串
+        start = content.find('[')
+        if start == -1:
+            return []
+        items = []
+        for raw in _QUOTED_ITEM_RE.findall(content, start):
+            try:
+                value = json.loads(f'"{raw}"')
+            except Exception:
+                value = raw
+            value = value.strip()
+            if value:
+                items.append(value)
+        return items
+
+    @staticmethod
+    def _parse_list_lines(content: str, prefix: str) -> List[str]:
+        """逐行解析列表（模型未按JSON格式返回时的退路）"""
+        items = []
+        for line in content.split('\n'):
+            line = line.strip()
+            if line and not line.startswith('#') and not line.startswith(prefix):
+                # 移除序号和常见前缀
+                cleaned = line.strip(_LIST_MARK_STRIP)
+                if cleaned:
+                    items.append(cleaned)
+        return items
+
+    async def _generate_insights(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
+        """使用百度AI Studio生成洞察（流式，凑满5条即停）"""
+        try:
+            prompt = f"""基于以下对话内容生成3-5个深度洞察：
+对话内容：{dialogue}
+情感分数：{sentiment_score} (范围-1到1，-1最消极，1最积极)
+关键词：{', '.join(keywords)}
+复杂度分数：{complexity_score} (范围0-1)
+
+请用中文生成3-5个深度洞察，每个洞察一句话，格式简洁明了。
+只返回一个JSON对象：{{"insights": ["洞察1", "洞察2", ...]}}"""
+
+            pieces = []
+            insights: List[str] = []
+            async for piece in self._stream_chat(
+                [{"role": "user", "content": prompt}],
+                max_tokens=400,
+                temperature=0.8
+            ):
+                pieces.append(piece)
+                insights = self._parse_list_payload(''.join(pieces), "insights")
+                if len(insights) >= 5:
+                    # 已凑满5条，提前断流省掉剩余生成
+                    break
+            content = ''.join(pieces)
+            print(f"🔍 洞察生成内容: {content}")
+
+            if not insights:
+                insights = self._parse_list_lines(content, '洞察：')
+
+            result_insights = insights[:5] if insights else ["对话分析洞察生成完成"]
+            print(f"🤖 百度AI生成洞察: {result_insights}")
+            return result_insights
+
         except Exception as e:
             print(f"❌ 百度AI洞察生成错误: {e}")
             import traceback
             traceback.print_exc()
             return ["AI洞察生成失败，使用基础洞察"]
 
-    async def generate_recommendations(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
-        """使用百度AI Studio生成建议"""
+    async def _generate_recommendations(self, dialogue: str, sentiment_score: float, keywords: List[str], complexity_score: float) -> List[str]:
+        """使用百度AI Studio生成建议（流式，凑满5条即停）"""
         try:
             prompt = f"""基于以下对话内容生成3-5个建议：
 对话内容：{dialogue}
@@ -536,66 +833,64 @@ class BaiduAistudioProvider(LLMProvider):
 关键词：{', '.join(keywords)}
 复杂度分数：{complexity_score} (范围0-1)
 
-请用中文生成3-5个实用建议，每个建议一句话，提供具体的改进方向。"""
-            
-            response = await self.client.post(
-                f"{self.base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 400,
-                    "temperature": 0.8
-                }
-            )
-            
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                    print(f"🔍 建议生成API原始响应: {result}")
-                    content = result["choices"][0]["message"]["content"]
-                    print(f"🔍 建议生成内容: {content}")
-                    
-                    # 解析建议
-                    recommendations = []
-                    lines = content.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line and not line.startswith('#') and not line.startswith('建议：'):
-                            # 移除序号和常见前缀
-                            cleaned = line.strip('123456789.-、。· ')
-                            if cleaned:
-                                recommendations.append(cleaned)
-                    
-                    if not recommendations:
-                        # 如果解析失败，尝试按其他方式解析
-                        content = content.replace('建议：', '').replace('建议:', '')
-                        lines = [line.strip() for line in content.split('\n') if line.strip() and not line.startswith('建议')]
-                        recommendations = [line.strip('123456789.-、。· ') for line in lines if line.strip()]
-                    
-                    result_recommendations = recommendations[:5] if recommendations else ["对话改进建议生成完成"]
-                    print(f"🤖 百度AI生成建议: {result_recommendations}")
-                    return result_recommendations
-                except Exception as parse_error:
-                    print(f"❌ 建议响应解析错误: {parse_error}")
-                    print(f"❌ 原始响应: {result}")
-                    return ["AI建议生成失败，使用基础建议"]
-            else:
-                print(f"❌ 百度AI建议生成API错误: {response.status_code}")
-                return ["AI建议生成失败，使用基础建议"]
-                
+请用中文生成3-5个实用建议，每个建议一句话，提供具体的改进方向。
+只返回一个JSON对象：{{"recommendations": ["建议1", "建议2", ...]}}"""
+
+            pieces = []
+            recommendations: List[str] = []
+            async for piece in self._stream_chat(
+                [{"role": "user", "content": prompt}],
+                max_tokens=400,
+                temperature=0.8
+            ):
+                pieces.append(piece)
+                recommendations = self._parse_list_payload(''.join(pieces), "recommendations")
+                if len(recommendations) >= 5:
+                    # 已凑满5条，提前断流省掉剩余生成
+                    break
+            content = ''.join(pieces)
+            print(f"🔍 建议生成内容: {content}")
+
+            if not recommendations:
+                recommendations = self._parse_list_lines(content, '建议：')
+
+            result_recommendations = recommendations[:5] if recommendations else ["对话改进建议生成完成"]
+            print(f"🤖 百度AI生成建议: {result_recommendations}")
+            return result_recommendations
+
         except Exception as e:
             print(f"❌ 百度AI建议生成错误: {e}")
             import traceback
             traceback.print_exc()
             return ["AI建议生成失败，使用基础建议"]
-    
+
     async def close(self):
-        """关闭客户端"""
-        await self.client.aclose()
+        """关闭提供商（共享HTTP客户端由close_shared_client统一关闭）"""
+        pass
+
+
+def _build_paddle_provider(**kwargs) -> LLMProvider:
+    """构造飞桨提供商（导入放在函数内，只在用到paddle时付出）"""
+    from infrastructure.llm_providers.paddle_provider import PaddleLLMProvider
+    client = PaddleLLMProvider()
+    if "access_token" in kwargs:
+        client.set_access_token(kwargs["access_token"])
+    return client
+
+
+# 提供商类型 -> 构造函数的注册表：一次字典查询替代逐个比较的
+# if/elif链，.lower()也只算一次；lambda里的类名在调用时才解析，
+# 保持与原先分支相同的惰性语义
+_PROVIDERS = {
+    "paddle": _build_paddle_provider,
+    "openai": lambda **kwargs: OpenAIProvider(kwargs.get("api_key", "")),
+    "wenxin": lambda **kwargs: WenxinProvider(
+        api_key=kwargs.get("api_key", ""),
+        secret_key=kwargs.get("secret_key", "")
+    ),
+    "local": lambda **kwargs: LocalModelProvider(kwargs.get("model_path", "")),
+    "baidu": lambda **kwargs: BaiduAistudioProvider(kwargs.get("access_token", ""))
+}
 
 
 class LLMProviderFactory:
@@ -604,22 +899,8 @@ class LLMProviderFactory:
     @staticmethod
     def create_provider(provider_type: str, **kwargs) -> LLMProvider:
         """创建LLM提供商实例"""
-        if provider_type.lower() == "paddle":
-            from infrastructure.llm_providers.paddle_provider import PaddleLLMProvider
-            client = PaddleLLMProvider()
-            if "access_token" in kwargs:
-                client.set_access_token(kwargs["access_token"])
-            return client
-        elif provider_type.lower() == "openai":
-            return OpenAIProvider(kwargs.get("api_key", ""))
-        elif provider_type.lower() == "wenxin":
-            return WenxinProvider(
-                api_key=kwargs.get("api_key", ""),
-                secret_key=kwargs.get("secret_key", "")
-            )
-        elif provider_type.lower() == "local":
-            return LocalModelProvider(kwargs.get("model_path", ""))
-        elif provider_type.lower() == "baidu":
-            return BaiduAistudioProvider(kwargs.get("access_token", ""))
-        else:
-            raise ValueError(f"Unsupported provider type: {provider_type}")
\ No newline at end of file
+        try:
+            builder = _PROVIDERS[provider_type.lower()]
+        except KeyError:
+            raise ValueError(f"Unsupported provider type: {provider_type}")
+        return builder(**kwargs)
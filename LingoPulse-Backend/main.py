@@ -23,6 +23,8 @@ try:
     from fastapi.middleware.gzip import GZipMiddleware
     from fastapi.responses import JSONResponse
     import logging
+    import logging.handlers
+    import queue
     import json
     from datetime import datetime
 except ImportError as e:
@@ -111,15 +113,24 @@ def setup_logging():
     log_format = settings.log_format
     date_format = "%Y-%m-%d %H:%M:%S"
     
+    # 实际写文件/终端的处理器由后台QueueListener驱动，
+    # 业务协程只向内存队列投递日志，不等待I/O flush
+    output_handlers = [
+        logging.FileHandler(log_dir / "lingopulse.log", encoding="utf-8"),
+        logging.StreamHandler()
+    ]
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *output_handlers, respect_handler_level=True
+    )
+    listener.start()
+
     # 配置根日志器
     logging.basicConfig(
         level=getattr(logging, settings.log_level.upper()),
         format=log_format,
         datefmt=date_format,
-        handlers=[
-            logging.FileHandler(log_dir / "lingopulse.log", encoding="utf-8"),
-            logging.StreamHandler()
-        ]
+        handlers=[logging.handlers.QueueHandler(log_queue)]
     )
     
     # 设置第三方库的日志级别
@@ -4,6 +4,13 @@ Presentation Layer - API Controllers
 """
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, File, UploadFile
 from fastapi.responses import JSONResponse
+
+# 兼容性处理 orjson（序列化大报告时明显更快）
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as ExportJSONResponse
+except ImportError:
+    ExportJSONResponse = JSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
@@ -342,7 +349,7 @@ async def export_analysis_report(
         report = await use_case.execute(conversation_id=conversation_id, format_type=format_type)
         
         if format_type == "json":
-            return JSONResponse(content=report)
+            return ExportJSONResponse(content=report)
         else:
             # 对于 PDF/CSV，返回文件下载链接或文件内容
             # 这里简化为返回报告数据
@@ -548,46 +555,27 @@ async def _analyze_conversation_with_ai(dialogue: str, scenario: str, llm_provid
             # 记录实际使用的提供商
             print(f"✅ 实际使用AI提供商: {provider_used}")
             
-            # 并行执行AI分析任务
-            tasks = []
-            
-            # 1. AI情感分析
-            tasks.append(llm_provider.analyze_sentiment(dialogue))
-            
-            # 2. AI关键词提取
-            tasks.append(llm_provider.extract_keywords(dialogue, max_keywords=8))
-            
-            # 3. AI复杂度分析
-            tasks.append(llm_provider.calculate_complexity(dialogue))
-            
-            # 执行所有AI分析任务
-            ai_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
+            # 批量AI分析：支持批量提示词的提供商一个请求拿齐三项，
+            # 其余提供商由基类默认实现并发执行三个单项调用
+            ai_analysis = await llm_provider.analyze_all(dialogue, max_keywords=8)
+
             # 处理AI结果 - 确保所有变量都有默认值
             ai_sentiment_score = None
             ai_keywords = []
             ai_complexity = None
-            
-            if isinstance(ai_results[0], (int, float)):
-                ai_sentiment_score = ai_results[0]
+
+            if isinstance(ai_analysis.get("sentiment"), (int, float)):
+                ai_sentiment_score = ai_analysis["sentiment"]
                 print(f"🤖 AI情感分析结果: {ai_sentiment_score}")
-            
-            if isinstance(ai_results[1], list):
-                ai_keywords = ai_results[1]
+
+            if isinstance(ai_analysis.get("keywords"), list):
+                ai_keywords = ai_analysis["keywords"]
                 print(f"🔍 AI关键词提取结果: {ai_keywords}")
-                
-            if isinstance(ai_results[2], (int, float)):
-                ai_complexity = ai_results[2]
+
+            if isinstance(ai_analysis.get("complexity"), (int, float)):
+                ai_complexity = ai_analysis["complexity"]
                 print(f"📊 AI复杂度分析结果: {ai_complexity}")
-                
-            # 处理可能的异常情况
-            if isinstance(ai_results[0], Exception):
-                print(f"❌ AI情感分析失败: {ai_results[0]}")
-            if isinstance(ai_results[1], Exception):
-                print(f"❌ AI关键词提取失败: {ai_results[1]}")
-            if isinstance(ai_results[2], Exception):
-                print(f"❌ AI复杂度计算失败: {ai_results[2]}")
-                
+
         except Exception as ai_error:
             print(f"AI分析失败，使用传统方法: {ai_error}")
             # 如果AI失败，使用传统方法的情感分数